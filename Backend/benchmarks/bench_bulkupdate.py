@@ -0,0 +1,89 @@
+"""
+/mark/bulkupdate write path: per-record subject lookups + insert_many vs
+one $in lookup + unordered bulk_write upserts.
+
+Needs a MongoDB server (MONGODB_URI, default mongodb://localhost:27017).
+Everything is written to a scratch database that is dropped afterwards.
+
+Run from Backend/:  python -m benchmarks.bench_bulkupdate [records] [subjects]
+"""
+import datetime
+import os
+import sys
+import time
+
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.attendance_bulk import bulk_upsert_attendance, resolve_subjects  # noqa: E402
+from utils.db_indexes import ensure_indexes  # noqa: E402
+
+SCRATCH_DB = "bench_bulkupdate"
+
+
+def make_records(n_records, n_subjects):
+    """n_records marks: students x subjects x days, 2024-01-01 onwards."""
+    start = datetime.date(2024, 1, 1)
+    per_day = 60 * n_subjects
+    return [{
+        'roll': f"R{i % 60:03d}",
+        'subject_code': f"SUB{(i // 60) % n_subjects:02d}",
+        'date': (start + datetime.timedelta(days=i // per_day)).isoformat(),
+        'branch': 'CSE',
+        'status': 'present',
+    } for i in range(n_records)]
+
+
+def legacy_bulkupdate(db, records):
+    for record in records:
+        subject = db['subjects'].find_one({'code': record['subject_code']})
+        if subject:
+            record['subject_name'] = subject['name']
+            record['semester'] = subject['semester']
+    db['attendance'].insert_many(records)
+
+
+def batched_bulkupdate(db, records):
+    subjects = resolve_subjects(db['subjects'], [r.get('subject_code') for r in records])
+    return bulk_upsert_attendance(db['attendance'], records, subjects)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_subjects = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    client = MongoClient(os.environ.get("MONGODB_URI", "mongodb://localhost:27017"))
+    client.drop_database(SCRATCH_DB)
+    db = client[SCRATCH_DB]
+    try:
+        db['subjects'].insert_many([{'code': f"SUB{i:02d}", 'name': f"Subject {i}", 'semester': 5}
+                                    for i in range(n_subjects)])
+
+        # Legacy path has no unique key, so run it without the index
+        legacy_time, _ = timed(legacy_bulkupdate, db, make_records(n_records, n_subjects))
+        db['attendance'].drop()
+        ensure_indexes(db)
+
+        first_time, (_, first, _) = timed(batched_bulkupdate, db, make_records(n_records, n_subjects))
+        again_time, (_, again, _) = timed(batched_bulkupdate, db, make_records(n_records, n_subjects))
+        stored = db['attendance'].count_documents({})
+    finally:
+        client.drop_database(SCRATCH_DB)
+        client.close()
+
+    print(f"{n_records} records, {n_subjects} subjects")
+    print(f"  legacy find_one + insert_many : {legacy_time:8.3f}s  {n_records / legacy_time:10.0f} rec/s")
+    print(f"  $in + bulk upsert (new)       : {first_time:8.3f}s  {n_records / first_time:10.0f} rec/s  {first}")
+    print(f"  same batch resubmitted        : {again_time:8.3f}s  {n_records / again_time:10.0f} rec/s  {again}")
+    print(f"  documents stored after resubmit: {stored} (expected {n_records})")
+
+
+if __name__ == "__main__":
+    main()
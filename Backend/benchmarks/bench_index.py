@@ -0,0 +1,54 @@
+"""
+Recall and latency of the approximate IVF index against exact search.
+
+Run from Backend/:  python -m benchmarks.bench_index
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.face_index import BruteForceIndex, IVFIndex, recall_at_k  # noqa: E402
+
+GALLERY_SIZES = [1000, 20000, 100000]
+N_PROBES = [1, 4, 8, 16, 32]
+N_QUERIES = 200
+K = 5
+
+
+def make_gallery(n, rng):
+    # Clustered like real galleries: a few thousand identities, each a tight blob
+    centres = rng.normal(0, 0.1, size=(max(1, n // 4), 128))
+    return centres[rng.integers(0, len(centres), n)] + rng.normal(0, 0.02, size=(n, 128))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n in GALLERY_SIZES:
+        gallery = make_gallery(n, rng)
+        queries = gallery[rng.choice(n, N_QUERIES, replace=False)] + rng.normal(0, 0.01, size=(N_QUERIES, 128))
+
+        exact = BruteForceIndex(gallery)
+        start = time.perf_counter()
+        exact.search(queries, K)
+        exact_ms = (time.perf_counter() - start) * 1000 / N_QUERIES
+
+        start = time.perf_counter()
+        ivf = IVFIndex(gallery)
+        build_s = time.perf_counter() - start
+
+        print(f"gallery={n} lists={ivf.n_lists} build={build_s:.2f}s exact={exact_ms:.3f} ms/query")
+        for n_probe in N_PROBES:
+            ivf.n_probe = n_probe
+            start = time.perf_counter()
+            ivf.search(queries, K)
+            ivf_ms = (time.perf_counter() - start) * 1000 / N_QUERIES
+            recall = recall_at_k(ivf, exact, queries, K)
+            print(f"  n_probe={n_probe:>3}  recall@{K}={recall:.3f}  {ivf_ms:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
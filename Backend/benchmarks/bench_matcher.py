@@ -0,0 +1,68 @@
+"""
+Microbenchmark: FaceMatcher vs the old per-face face_distance loop.
+
+Run from Backend/:  python -m benchmarks.bench_matcher
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import face_recognition  # noqa: E402
+from utils.face_matcher import FaceMatcher  # noqa: E402
+
+GALLERY_SIZES = [50, 1000, 20000]
+FACES_PER_FRAME = 8
+REPEATS = 20
+
+
+def legacy_match(face_encodings, known_face_encodings, known_face_names, tolerance=0.5):
+    """The loop process_frame used before FaceMatcher."""
+    face_names = []
+    for face_encoding in face_encodings:
+        name = "Unknown"
+        if known_face_encodings:
+            distances = face_recognition.face_distance(known_face_encodings, face_encoding)
+            matches = [i for i, d in enumerate(distances) if d < tolerance]
+            if matches:
+                best_match_index = matches[np.argmin([distances[i] for i in matches])]
+                name = known_face_names[best_match_index]
+        face_names.append(name)
+    return face_names
+
+
+def make_gallery(n, rng):
+    # Real encodings sit roughly on a sphere of radius ~1.3 around a common mean
+    base = rng.normal(0, 0.1, size=(n, 128))
+    return [row for row in base], [f"{i}_1_Student{i}_CSE" for i in range(n)]
+
+
+def timed(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'gallery':>8} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8} {'same':>5}")
+    for n in GALLERY_SIZES:
+        encodings, names = make_gallery(n, rng)
+        # Half the probes are noisy copies of gallery faces, half are strangers
+        picks = rng.choice(n, FACES_PER_FRAME // 2, replace=False)
+        probes = [encodings[i] + rng.normal(0, 0.02, 128) for i in picks]
+        probes += [rng.normal(0, 0.1, 128) for _ in range(FACES_PER_FRAME - len(probes))]
+
+        matcher = FaceMatcher(encodings, names)
+        legacy_s, legacy_names = timed(lambda: legacy_match(probes, encodings, names), REPEATS)
+        matcher_s, matcher_names = timed(lambda: matcher.match_names(probes), REPEATS)
+        print(f"{n:>8} {legacy_s * 1000:>10.2f} {matcher_s * 1000:>11.2f} "
+              f"{legacy_s / matcher_s:>7.1f}x {str(legacy_names == matcher_names):>5}")
+
+
+if __name__ == "__main__":
+    main()
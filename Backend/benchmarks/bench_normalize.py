@@ -0,0 +1,104 @@
+"""
+Gallery load time and disk footprint before/after registration image normalization.
+
+Run from Backend/:  python -m benchmarks.bench_normalize [known_faces_dir]
+The gallery is read as in benchmarks.gallery: the face image store (or, with
+MONGODB_URI set, the photos students link) plus photos not yet migrated.
+Each image is normalized the way /register now stores it (face crop with
+margin, bounded size, fixed-quality JPEG). Both galleries are then encoded
+as backfill-encodings does, and the encodings of the same student are
+compared so the speedup is not bought with recognition accuracy.
+Photos already in the store were normalized on registration, so only the
+not-yet-migrated ones show the full difference.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.gallery import IMAGE_EXTENSIONS, connect_if_configured, gallery_photos  # noqa: E402
+from utils.face_recognition_utils import encode_images, normalize_registration_image  # noqa: E402
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "data", "known_faces")
+
+
+def gallery_files(directory):
+    """Images in one of the flat before/after directories this benchmark writes."""
+    return [f for f in sorted(os.listdir(directory)) if f.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def dir_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, f)) for f in gallery_files(directory))
+
+
+def time_decode(directory):
+    start = time.perf_counter()
+    for filename in gallery_files(directory):
+        cv2.imread(os.path.join(directory, filename), cv2.IMREAD_COLOR)
+    return time.perf_counter() - start
+
+
+def time_load(directory):
+    files = gallery_files(directory)
+    start = time.perf_counter()
+    results = encode_images([os.path.join(directory, f) for f in files])
+    elapsed = time.perf_counter() - start
+    return elapsed, {os.path.splitext(f)[0]: encoding for f, (encoding, _) in zip(files, results)
+                     if encoding is not None}
+
+
+def main():
+    src_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DIR
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_dir, after_dir = os.path.join(tmp, "before"), os.path.join(tmp, "after")
+        os.makedirs(before_dir)
+        os.makedirs(after_dir)
+
+        skipped = []
+        for label, path in gallery_photos(src_dir, connect_if_configured()):
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            result, error = normalize_registration_image(image) if image is not None else (None, "unreadable")
+            if result is None:
+                skipped.append(f"{label}: {error}")
+                continue
+            shutil.copy(path, os.path.join(before_dir, label + os.path.splitext(path)[1]))
+            with open(os.path.join(after_dir, label + ".jpg"), "wb") as f:
+                f.write(result[1])
+
+        n_images = len(gallery_files(before_dir))
+        print(f"{n_images} images ({len(skipped)} skipped: no single face)")
+        for line in skipped:
+            print(f"  skipped {line}")
+        if not n_images:
+            return
+
+        rows = []
+        for label, directory in (("original", before_dir), ("normalized", after_dir)):
+            decode = time_decode(directory)
+            load, encodings = time_load(directory)
+            rows.append((label, dir_size(directory), decode, load, encodings))
+
+        print(f"{'':12}{'disk MB':>10}{'decode s':>10}{'load s':>10}{'ms/image':>10}")
+        for label, size, decode, load, _ in rows:
+            print(f"{label:12}{size / 2**20:10.2f}{decode:10.3f}{load:10.2f}{load / n_images * 1000:10.1f}")
+        (_, size_b, decode_b, load_b, enc_b), (_, size_a, decode_a, load_a, enc_a) = rows
+        print(f"disk {size_b / max(size_a, 1):.1f}x smaller, decode {decode_b / max(decode_a, 1e-9):.1f}x "
+              f"and gallery load {load_b / max(load_a, 1e-9):.1f}x faster")
+
+        common = sorted(set(enc_b) & set(enc_a))
+        if common:
+            drift = [np.linalg.norm(enc_b[name] - enc_a[name]) for name in common]
+            print(f"encoding distance original vs normalized: mean {np.mean(drift):.3f}, "
+                  f"max {np.max(drift):.3f} (match tolerance 0.5)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Photo encoding time vs number of worker processes (as in backfill-encodings).
+
+Run from Backend/:  python -m benchmarks.bench_parallel_encoding [known_faces_dir] [repeat]
+Small galleries are replicated `repeat` times into a temp dir so scaling is visible.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.face_recognition_utils import encode_images  # noqa: E402
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "data", "known_faces")
+
+
+def replicate_gallery(src_dir, dst_dir, repeat):
+    """Copy each image `repeat` times under distinct roll numbers."""
+    images = [f for f in sorted(os.listdir(src_dir)) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
+    for copy in range(repeat):
+        for filename in images:
+            roll, rest = filename.split("_", 1)
+            shutil.copy(os.path.join(src_dir, filename), os.path.join(dst_dir, f"{roll}{copy:03d}_{rest}"))
+
+
+def main():
+    src_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DIR
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replicate_gallery(src_dir, tmp, repeat)
+        paths = [os.path.join(tmp, f) for f in sorted(os.listdir(tmp))]
+        n_images = len(paths)
+        print(f"{n_images} images, {cores} cores")
+
+        baseline = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            results = encode_images(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            faces = sum(encoding is not None for encoding, _ in results)
+            print(f"workers={workers:>2}  {elapsed:7.2f}s  {n_images / elapsed:6.1f} img/s  "
+                  f"speedup {baseline / elapsed:4.1f}x  faces={faces}")
+
+
+if __name__ == "__main__":
+    main()
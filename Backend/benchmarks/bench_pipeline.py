@@ -0,0 +1,197 @@
+"""
+Offline benchmark of the recognition pipeline (no camera; MongoDB optional).
+
+Synthetic frames are built by pasting the gallery photos (see
+benchmarks.gallery: the face image store under data/known_faces, or the
+students' linked photos when MONGODB_URI is set) onto a blank canvas at
+several face sizes and counts, then timed stage by stage: resize, detect,
+encode, match, draw. Results are printed as JSON so runs can be diffed or
+stored.
+
+Run from Backend/:
+    python -m benchmarks.bench_pipeline --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from statistics import mean, median
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.gallery import connect_if_configured, gallery_photos  # noqa: E402
+from utils.face_matcher import FaceMatcher  # noqa: E402
+from utils.face_recognition_utils import (  # noqa: E402
+    detect_faces, draw_face_boxes, encode_faces, encode_images, scale_locations
+)
+from utils.encoding_store import EncodingStore, write_store  # noqa: E402
+from utils.recognition_profile import RecognitionProfile  # noqa: E402
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "data", "known_faces")
+
+
+def load_gallery_images(photos):
+    images = []
+    for _, path in photos:
+        image = cv2.imread(path)
+        if image is not None:
+            images.append(image)
+    return images
+
+
+def composite_frame(images, n_faces, face_height, frame_size, rng):
+    """Paste n_faces gallery images, resized to face_height, on a grey frame."""
+    width, height = frame_size
+    frame = np.full((height, width, 3), 96, dtype=np.uint8)
+    cols = max(1, width // (face_height + 10))
+    for i in range(n_faces):
+        image = images[rng.integers(len(images))]
+        scale = face_height / image.shape[0]
+        tile = cv2.resize(image, (max(1, int(image.shape[1] * scale)), face_height))
+        row, col = divmod(i, cols)
+        top, left = 10 + row * (face_height + 10), 10 + col * (tile.shape[1] + 10)
+        if top + tile.shape[0] > height or left + tile.shape[1] > width:
+            break
+        frame[top:top + tile.shape[0], left:left + tile.shape[1]] = tile
+    return frame
+
+
+def time_gallery_load(photos):
+    """
+    Encoding the gallery photos (registration / backfill cost) against
+    writing and mapping the shared encoding store that sessions read.
+    """
+    start = time.perf_counter()
+    results = encode_images([path for _, path in photos])
+    encode = time.perf_counter() - start
+
+    entries = [(encoding, {"roll": str(i), "semester": 1, "branch": "BENCH", "name": label})
+               for i, ((label, _), (encoding, _)) in enumerate(zip(photos, results)) if encoding is not None]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.bin")
+        start = time.perf_counter()
+        write_store(path, entries)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = EncodingStore(path)
+        store.refresh()
+        encodings, names, _ = store.select(1, "BENCH")
+        encodings = np.array(encodings)  # copy out of the map before the temp dir goes
+        load = time.perf_counter() - start
+
+    return {"images": len(names), "encode_s": encode, "store_build_s": build, "store_load_s": load}, encodings, names
+
+
+def time_frame(frame, matcher, profile):
+    timings = {}
+    start = time.perf_counter()
+    small = cv2.resize(frame, (0, 0), fx=profile.scale, fy=profile.scale)
+    rgb_small = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    timings["resize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    locations = detect_faces(rgb_small, profile.scale, profile)
+    timings["detect"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encodings = encode_faces(rgb_small, locations, profile)
+    timings["encode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    names = matcher.match_names(encodings)
+    timings["match"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    draw_face_boxes(frame.copy(), scale_locations(locations, 1 / profile.scale), names)
+    timings["draw"] = time.perf_counter() - start
+
+    timings["total"] = sum(timings.values())
+    return timings, len(locations), sum(name != "Unknown" for name in names)
+
+
+def summarize(samples):
+    return {"mean_ms": mean(samples) * 1000, "median_ms": median(samples) * 1000, "max_ms": max(samples) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces-dir", default=DEFAULT_DIR)
+    parser.add_argument("--frame-size", default="1280x720", help="WIDTHxHEIGHT of synthetic frames")
+    parser.add_argument("--face-heights", default="80,160,320", help="Face sizes in pixels")
+    parser.add_argument("--face-counts", default="1,4,8", help="Faces per frame")
+    parser.add_argument("--scale", default="0.5", help="Downscale factor passed to the profile")
+    parser.add_argument("--frames", type=int, default=10, help="Frames timed per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    frame_size = tuple(int(v) for v in args.frame_size.split("x"))
+    rng = np.random.default_rng(args.seed)
+    tracemalloc.start()
+
+    photos = gallery_photos(args.faces_dir, connect_if_configured())
+    if not photos:
+        parser.error(f"No gallery photos found under {args.faces_dir}")
+    # Keep stdout clean for the JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        gallery, encodings, names = time_gallery_load(photos)
+    matcher = FaceMatcher(encodings, names)
+    profile = RecognitionProfile(scale=float(args.scale))
+    images = load_gallery_images(photos)
+
+    scenarios = []
+    for face_height in (int(v) for v in args.face_heights.split(",")):
+        for n_faces in (int(v) for v in args.face_counts.split(",")):
+            frame = composite_frame(images, n_faces, face_height, frame_size, rng)
+            stages = {key: [] for key in ("resize", "detect", "encode", "match", "draw", "total")}
+            detected = recognised = 0
+            for _ in range(args.frames):
+                timings, detected, recognised = time_frame(frame, matcher, profile)
+                for key, value in timings.items():
+                    stages[key].append(value)
+            scenarios.append({
+                "face_height": face_height,
+                "faces": n_faces,
+                "detected": detected,
+                "recognised": recognised,
+                "fps": 1 / mean(stages["total"]),
+                "stages": {key: summarize(values) for key, values in stages.items()},
+            })
+
+    _, peak_python = tracemalloc.get_traced_memory()
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "config": vars(args),
+        "gallery_load": gallery,
+        "frames": scenarios,
+        "peak_memory": {
+            "python_heap_mb": peak_python / 2 ** 20,
+            # ru_maxrss is KiB on Linux
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
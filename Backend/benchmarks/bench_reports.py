@@ -0,0 +1,151 @@
+"""
+Report engine vs the previous per-record loops on synthetic data.
+
+Run from Backend/:  python -m benchmarks.bench_reports [students] [subjects] [days]
+Checks that both produce identical DataFrames and prints timings.
+"""
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.report_engine import aggregate_records, daily_report, subject_report, summary_report  # noqa: E402
+
+
+# --- Previous implementations, kept here as the reference -----------------
+
+def legacy_daily(students, attendance_records, subject_codes, start_date, end_date):
+    date_range = pd.date_range(start=start_date, end=end_date).strftime('%Y-%m-%d').tolist()
+    column_headers = []
+    for subj in subject_codes:
+        for date in date_range:
+            column_headers.append(f'{subj}_{date}')
+    sheet_data = []
+    for s in students:
+        roll = str(s.get('roll_no') or s.get('roll', '')).strip()
+        row = {'Roll No': roll, 'Name': s.get('name', ''), 'Branch': s.get('branch', '')}
+        for header in column_headers:
+            row[header] = 'Absent'
+        sheet_data.append(row)
+    for r in attendance_records:
+        roll = str(r.get('roll_no') or r.get('roll', '')).strip()
+        subj = r.get('subject_code')
+        key = f'{subj}_{r.get("date")}'
+        if roll and subj in subject_codes and key in column_headers:
+            for row in sheet_data:
+                if row['Roll No'] == roll:
+                    row[key] = 'Present'
+                    break
+    return pd.DataFrame(sheet_data)
+
+
+def legacy_subject(students, attendance_records, subject_code):
+    total_classes = len(set(r['date'] for r in attendance_records if r.get('subject_code') == subject_code))
+    data_rows = []
+    for s in students:
+        roll = str(s.get('roll_no') or s.get('roll', '')).strip()
+        present_count = 0
+        for r in attendance_records:
+            rec_roll = str(r.get('roll_no') or r.get('roll', '')).strip()
+            if rec_roll == roll and r.get('subject_code') == subject_code and r.get('status', '').lower() == 'present':
+                present_count += 1
+        attendance_percentage = round((present_count / total_classes) * 100, 2) if total_classes > 0 else 0
+        data_rows.append({
+            'Subject Code': subject_code, 'Roll No': roll, 'Name': s.get('name', ''),
+            'Branch': s.get('branch', ''), 'Classes Held': total_classes,
+            'Present Count': present_count, 'Attendance %': attendance_percentage
+        })
+    return pd.DataFrame(data_rows)
+
+
+def legacy_summary(students, attendance_records, subject_codes):
+    students = [dict(s) for s in students]
+    student_map = {}
+    for s in students:
+        roll = str(s.get('roll_no') or s.get('roll', '')).strip()
+        if roll:
+            student_map[roll] = s
+    subject_class_count = {
+        subj: len(set(r['date'] for r in attendance_records if r['subject_code'] == subj))
+        for subj in subject_codes
+    }
+    for s in students:
+        for subj in subject_codes:
+            s[f'{subj}_Present'] = 0
+    for r in attendance_records:
+        roll = str(r.get('roll_no') or r.get('roll', '')).strip()
+        subj = r.get('subject_code')
+        if roll in student_map and subj in subject_codes and r.get('status', '').lower() == 'present':
+            student_map[roll][f'{subj}_Present'] += 1
+    rows = []
+    for s in students:
+        row = {'Roll No': s.get('roll_no') or s.get('roll') or '', 'Name': s.get('name', ''),
+               'Branch': s.get('branch', '')}
+        for subj in subject_codes:
+            row[f'{subj} Classes Held'] = subject_class_count.get(subj, 0)
+            row[f'{subj} Present'] = s.get(f'{subj}_Present', 0)
+        rows.append(row)
+    summary = pd.DataFrame([{'Subject Code': subj, 'Total Classes Held': subject_class_count[subj]}
+                            for subj in subject_codes])
+    return pd.DataFrame(rows), summary
+
+
+# --- Synthetic data ---------------------------------------------------------
+
+def make_data(n_students, n_subjects, n_days, rng):
+    students = [{'roll_no': str(i), 'name': f'Student{i}', 'branch': 'CSE', 'semester': 5}
+                for i in range(1, n_students + 1)]
+    subject_codes = [f'CS{500 + i}' for i in range(n_subjects)]
+    start = datetime.date(2025, 1, 1)
+    dates = [(start + datetime.timedelta(days=d)).isoformat() for d in range(n_days)]
+    records = []
+    for date in dates:
+        # Each subject meets on roughly 3 days out of 5
+        for subj in subject_codes:
+            if rng.random() < 0.6:
+                for s in students:
+                    records.append({'roll': s['roll_no'], 'subject_code': subj, 'date': date,
+                                    'status': 'present' if rng.random() < 0.8 else 'absent'})
+    return students, records, subject_codes, dates[0], dates[-1]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    n_students = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_subjects = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    n_days = int(sys.argv[3]) if len(sys.argv) > 3 else 120
+    students, records, subject_codes, start, end = make_data(n_students, n_subjects, n_days,
+                                                             np.random.default_rng(0))
+    print(f"{n_students} students, {n_subjects} subjects, {n_days} days, {len(records)} records")
+
+    cases = [
+        ("daily", lambda: legacy_daily(students, records, subject_codes, start, end),
+         lambda: daily_report(students, aggregate_records(records), subject_codes, start, end)),
+        ("subject", lambda: legacy_subject(students, records, subject_codes[0]),
+         lambda: subject_report(students, aggregate_records(records), subject_codes[0])),
+        ("summary", lambda: legacy_summary(students, records, subject_codes),
+         lambda: summary_report(students, aggregate_records(records), subject_codes)),
+    ]
+    for name, legacy, engine in cases:
+        legacy_s, expected = timed(legacy)
+        engine_s, actual = timed(engine)
+        if isinstance(expected, tuple):
+            same = all(a.equals(b) for a, b in zip(expected, actual))
+        else:
+            same = expected.equals(actual)
+        print(f"{name:>8}: legacy {legacy_s:8.3f}s  engine {engine_s:7.3f}s  "
+              f"speedup {legacy_s / engine_s:7.1f}x  identical={same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Registration photos of a gallery, for the benchmarks.
+
+The app keeps photos in the content-addressed FaceImageStore under
+data/known_faces/objects/ and links them from students.face_image; only
+galleries from before that change still have photos at the top level.
+"""
+import os
+
+import cv2
+
+from utils.face_image_store import FaceImageStore
+from utils.face_normalize import THUMBNAIL_SIDE
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def gallery_photos(known_faces_dir, db=None):
+    """
+    [(label, path)] of the gallery photos.
+    With db, the photos linked from students as face_image (what the app
+    encodes). Without it, every object in the store except thumbnails,
+    plus top-level photos not yet migrated. Labels are the object or file
+    name without extension.
+    """
+    store = FaceImageStore(known_faces_dir)
+    if db is not None:
+        names = sorted(n for n in db["students"].distinct("face_image") if store.exists(n))
+        return [(os.path.splitext(name)[0], store.path(name)) for name in names]
+
+    photos = []
+    for name in store.names():
+        path = store.path(name)
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        # Thumbnails share the store; they are at most THUMBNAIL_SIDE on a side
+        if image is not None and max(image.shape[:2]) > THUMBNAIL_SIDE:
+            photos.append((os.path.splitext(name)[0], path))
+    for filename in sorted(os.listdir(known_faces_dir)) if os.path.isdir(known_faces_dir) else []:
+        path = os.path.join(known_faces_dir, filename)
+        if filename.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path):
+            photos.append((os.path.splitext(filename)[0], path))
+    return photos
+
+
+def connect_if_configured():
+    """The app database when MONGODB_URI is set, else None (store-only mode)."""
+    if not os.environ.get("MONGODB_URI"):
+        return None
+    from utils import db as mongo_db
+    return mongo_db.get_db()
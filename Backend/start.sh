@@ -3,4 +3,6 @@
 # source venv/bin/activate
 
 # Run your Flask app
-gunicorn --bind 0.0.0.0:8080 app:app
+# Attendance sessions and the report cache live in process memory, so the app
+# must run as a single worker; concurrency comes from threads instead.
+gunicorn --bind 0.0.0.0:8080 --workers 1 --threads "${GUNICORN_THREADS:-8}" app:app
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# Run from anywhere: the app imports its helpers as `utils.<module>`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mongomock_operators(monkeypatch):
+    """
+    mongomock has no $trim and no $mergeObjects expression; evaluate them
+    like the server does for the values the app passes them.
+    """
+    mongomock_aggregate = pytest.importorskip("mongomock.aggregate")
+    handle = mongomock_aggregate._Parser._handle_string_operator
+    parse = mongomock_aggregate._Parser.parse
+
+    def handle_string_operator(parser, operator, values):
+        if operator == '$trim':
+            value = parser.parse(values['input'])
+            return None if value is None else str(value).strip()
+        return handle(parser, operator, values)
+
+    def parse_expression(parser, expression):
+        if isinstance(expression, dict) and list(expression) == ['$mergeObjects']:
+            merged = {}
+            for value in expression['$mergeObjects']:
+                merged.update(parser.parse(value) or {})
+            return merged
+        return parse(parser, expression)
+
+    monkeypatch.setattr(mongomock_aggregate._Parser, '_handle_string_operator', handle_string_operator)
+    monkeypatch.setattr(mongomock_aggregate._Parser, 'parse', parse_expression)
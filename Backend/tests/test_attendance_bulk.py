@@ -0,0 +1,88 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from utils.attendance_bulk import bulk_upsert_attendance, clean_mark, upsert_mark  # noqa: E402
+from utils.attendance_rollup import rebuild_rollups, record_marks, rollup_aggregates  # noqa: E402
+from utils.report_aggregation import aggregate_attendance  # noqa: E402
+
+
+class Roster:
+    def __init__(self, rolls):
+        self.rolls = set(rolls)
+
+    def contains(self, roll):
+        return roll in self.rolls
+
+
+@pytest.fixture
+def attendance():
+    collection = mongomock.MongoClient().db.attendance
+    # Written before roll became the standard field
+    collection.insert_one({'roll_no': '7', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'absent'})
+    return collection
+
+
+def test_upsert_mark_updates_legacy_roll_no_record(attendance):
+    record, error = clean_mark({'roll_no': '7', 'subject_code': 'CS301', 'date': '2024-03-01',
+                                'status': 'present'}, Roster({'7'}), ['roll_no', 'subject_code', 'date'])
+    assert error is None
+    assert upsert_mark(attendance, record) == 'updated'
+    assert attendance.count_documents({}) == 1
+    assert attendance.find_one({}, {'_id': 0}) == {
+        'roll_no': '7', 'roll': '7', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'
+    }
+
+
+def test_bulk_upsert_matches_legacy_records_and_copies_input(attendance):
+    records = [
+        {'roll': '7', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'},
+        {'roll_no': ' 8 ', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'},
+        {'roll': '8', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'absent'},
+        {'subject_code': 'CS301', 'date': '2024-03-01'},
+    ]
+    before = [dict(r) for r in records]
+    subjects = {'CS301': {'code': 'CS301', 'name': 'Networks', 'semester': 5}}
+
+    results, counts, written = bulk_upsert_attendance(attendance, records, subjects)
+
+    assert records == before
+    statuses = [r['status'] for r in results]
+    assert statuses[1] == 'duplicate' and statuses[3] == 'invalid'
+    # mongomock misreports which unordered operation upserted; the documents
+    # below show that the legacy record was updated and roll 8 inserted
+    assert sorted(statuses[0::2]) == ['updated', 'upserted']
+    assert [(w['roll'], w['status'], w['semester']) for w in written] == [('7', 'present', 5), ('8', 'absent', 5)]
+    assert attendance.count_documents({}) == 2
+    assert attendance.find_one({'roll_no': '7'})['status'] == 'present'
+
+
+def test_clean_mark_rejects_non_object_body():
+    assert clean_mark(['not', 'a', 'mark'], Roster({'7'}), ['roll_no'])[1] == ('Missing required fields', 400)
+    assert clean_mark(None, Roster({'7'}), ['roll_no'])[1] == ('Missing required fields', 400)
+
+
+def test_form_semester_is_stored_as_a_number(mongomock_operators):
+    db = mongomock.MongoClient().db
+    rebuild_rollups(db)
+    record, error = clean_mark({'roll_no': '7', 'name': 'Asha', 'branch': 'CSE', 'semester': '3',
+                                'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'},
+                               Roster({'7'}), ['roll_no', 'semester', 'subject_code', 'date'])
+    assert error is None and record['semester'] == 3
+    upsert_mark(db.attendance, record)
+    record_marks(db, [record])
+
+    # Reports query the integer semester, as they get it from the report form
+    query = {'semester': 3, 'branch': 'CSE', 'date': {'$gte': '2024-03-01', '$lte': '2024-03-31'}}
+    for aggregates in (aggregate_attendance(db.attendance, query),
+                       rollup_aggregates(db, query, '2024-03-01', '2024-03-31')):
+        assert aggregates['classes_held'] == {'CS301': 1}
+        assert aggregates['present_counts'].to_dict('records') == [
+            {'roll': '7', 'subject_code': 'CS301', 'count': 1}
+        ]
+
+
+def test_clean_mark_rejects_non_numeric_semester():
+    record, error = clean_mark({'roll_no': '7', 'semester': 'third', 'subject_code': 'CS301', 'date': '2024-03-01'},
+                               Roster({'7'}), ['roll_no', 'subject_code', 'date'])
+    assert record is None and error == ('Semester must be a number', 400)
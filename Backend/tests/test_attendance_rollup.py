@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("pandas")
+mongomock = pytest.importorskip("mongomock")
+
+from utils.attendance_rollup import (  # noqa: E402
+    CLASS_COLLECTION, ROLLUP_COLLECTION, forget_marks, rebuild_rollups, record_marks
+)
+
+CLASS = {'semester': 3, 'branch': 'CSE', 'subject_code': 'CS301'}
+
+
+@pytest.fixture
+def db(mongomock_operators):
+    return mongomock.MongoClient().db
+
+
+def rollups(db):
+    """{(semester, roll): days} for every student rollup."""
+    return {(d['semester'], d['roll']): d['days'] for d in db[ROLLUP_COLLECTION].find()}
+
+
+def class_days(db, semester=3):
+    doc = db[CLASS_COLLECTION].find_one(dict(CLASS, semester=semester)) or {}
+    return sorted(doc.get('days', {}))
+
+
+def write(db, record):
+    """Upsert a mark the way the write paths do, then fold it into the rollups."""
+    key = {'roll': record['roll'], 'subject_code': record['subject_code'], 'date': record['date']}
+    db.attendance.update_one(key, {'$set': record}, upsert=True)
+    record_marks(db, [record])
+
+
+def test_record_marks_matches_rebuild(db):
+    for roll, date, status in [('1', '2024-03-01', 'present'), ('1', '2024-03-02', 'absent'),
+                               ('2', '2024-03-01', 'Present')]:
+        write(db, dict(CLASS, roll=roll, date=date, status=status))
+    incremental = rollups(db)
+
+    rebuild_rollups(db)
+    assert rollups(db) == incremental == {
+        (3, '1'): {'2024-03-01': 'present', '2024-03-02': 'absent'},
+        (3, '2'): {'2024-03-01': 'present'},
+    }
+    doc = db[ROLLUP_COLLECTION].find_one({'roll': '1'})
+    assert (doc['present'], doc['absent'], doc['total']) == (1, 1, 2)
+
+
+def test_forget_keeps_day_while_a_legacy_duplicate_remains(db):
+    legacy = db.attendance.insert_one(dict(CLASS, roll_no=' 1 ', date='2024-03-01', status='absent')).inserted_id
+    current = db.attendance.insert_one(dict(CLASS, roll='1', date='2024-03-01', status='present')).inserted_id
+    rebuild_rollups(db)
+
+    deleted = db.attendance.find_one_and_delete({'_id': current})
+    forget_marks(db, [deleted])
+    assert rollups(db) == {(3, '1'): {'2024-03-01': 'absent'}}
+    assert class_days(db) == ['2024-03-01']
+
+    deleted = db.attendance.find_one_and_delete({'_id': legacy})
+    forget_marks(db, [deleted])
+    assert rollups(db) == {(3, '1'): {}}
+    assert class_days(db) == []
+
+
+def test_update_that_changes_semester_moves_the_day(db):
+    write(db, dict(CLASS, roll='1', date='2024-03-01', status='present'))
+    write(db, dict(CLASS, roll='2', date='2024-03-01', status='present'))
+    # Corrected: roll 1 was marked under the wrong semester
+    write(db, dict(CLASS, semester=4, roll='1', date='2024-03-01', status='present'))
+
+    assert rollups(db) == {
+        (3, '1'): {},
+        (3, '2'): {'2024-03-01': 'present'},
+        (4, '1'): {'2024-03-01': 'present'},
+    }
+    assert class_days(db, 3) == ['2024-03-01'] and class_days(db, 4) == ['2024-03-01']
+
+    write(db, dict(CLASS, semester=4, roll='2', date='2024-03-01', status='present'))
+    assert class_days(db, 3) == []
@@ -0,0 +1,28 @@
+import threading
+import time
+
+import pytest
+
+from utils.attendance_sessions import COMPLETED, SessionConflictError, SessionManager
+
+
+def test_one_running_session_per_class_and_subject():
+    release = threading.Event()
+    manager = SessionManager(max_concurrent=3)
+
+    def capture(session):
+        release.wait(timeout=5)
+        return {}
+
+    key = (3, 'CSE', 'CS301')
+    first = manager.start(capture, {}, key=key)
+    with pytest.raises(SessionConflictError):
+        manager.start(capture, {}, key=key)
+    # Another subject for the same class may run alongside
+    other = manager.start(capture, {}, key=(3, 'CSE', 'CS302'))
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while manager.active_count() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert first.status == other.status == COMPLETED
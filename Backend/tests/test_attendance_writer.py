@@ -0,0 +1,40 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from pymongo.errors import AutoReconnect  # noqa: E402
+
+from utils.attendance_writer import AttendanceWriteBuffer, AttendanceWriteError  # noqa: E402
+
+
+class Unavailable:
+    """Collection whose bulk writes always fail with a transient error."""
+
+    def bulk_write(self, operations, ordered=True):
+        raise AutoReconnect("primary unavailable")
+
+
+def test_flush_updates_legacy_roll_no_record():
+    collection = mongomock.MongoClient().db.attendance
+    collection.insert_one({'roll_no': '7', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'absent'})
+
+    buffer = AttendanceWriteBuffer(collection, flush_interval=60)
+    buffer.add('7', 'CS301', '2024-03-01', {'status': 'present'})
+    buffer.add('8', 'CS301', '2024-03-01', {'status': 'present'})
+    assert buffer.close()['written'] == 2
+
+    assert collection.count_documents({}) == 2
+    assert collection.find_one({'roll_no': '7'}, {'_id': 0})['status'] == 'present'
+    assert collection.find_one({'roll': '8'}, {'_id': 0}) == {
+        'roll': '8', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'
+    }
+
+
+def test_close_reports_writes_given_up_on():
+    buffer = AttendanceWriteBuffer(Unavailable(), flush_interval=60, max_retries=1, retry_delay=0)
+    buffer.add('7', 'CS301', '2024-03-01', {'status': 'present'})
+
+    with pytest.raises(AttendanceWriteError) as exc_info:
+        buffer.close()
+    assert exc_info.value.failed == [('7', 'CS301', '2024-03-01')]
+    assert buffer.stats['failed'] == 1
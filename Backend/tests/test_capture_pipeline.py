@@ -0,0 +1,39 @@
+import pytest
+
+from utils.capture_pipeline import DROP_OLDEST, CapturePipeline
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in that yields a fixed number of frames."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+
+def test_results_until_capture_ends():
+    pipeline = CapturePipeline(FakeCapture(range(5)), lambda frame: frame * 2,
+                               queue_depth=5, drop_policy=DROP_OLDEST).start()
+    results = list(pipeline.results())
+    pipeline.stop()
+
+    assert results == [0, 2, 4, 6, 8]
+    assert pipeline.error is None
+
+
+def test_worker_failure_is_reraised():
+    def process(frame):
+        if frame == 2:
+            raise ValueError("bad frame")
+        return frame
+
+    pipeline = CapturePipeline(FakeCapture(range(5)), process, workers=2,
+                               queue_depth=5, drop_policy=DROP_OLDEST).start()
+    with pytest.raises(ValueError, match="bad frame"):
+        list(pipeline.results())
+    with pytest.raises(ValueError, match="bad frame"):
+        pipeline.stop()
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from utils import db  # noqa: E402
+
+
+class FakeDatabase:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+
+class FakeCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.full_name = f"{database.name}.{name}"
+
+
+class FakeClient:
+    def __init__(self, uri, **options):
+        self.uri = uri
+        self.options = options
+        self.closed = False
+
+    def __getitem__(self, name):
+        return FakeDatabase(self, name)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    created = []
+
+    def factory(uri, **options):
+        client = FakeClient(uri, **options)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(db, "MongoClient", factory)
+    monkeypatch.setenv("MONGODB_URI", "mongodb://example.invalid")
+    monkeypatch.setenv("MONGODB_DB", "attendance_test")
+    db.close_client()
+    yield created
+    db.close_client()
+
+
+def test_one_client_per_process(clients):
+    students, attendance = db.LazyDatabase()["students"], db.LazyDatabase()["attendance"]
+    first = db.get_client()
+    # Every request resolves the same client through the lazy collections
+    for _ in range(5):
+        assert students.database.client is first
+        assert attendance.database.client is first
+    assert students.full_name == "attendance_test.students"
+    assert clients == [first]
+    assert first.options["connect"] is False
+
+
+def test_close_client_builds_a_new_one(clients):
+    first = db.get_client()
+    db.close_client()
+    assert first.closed
+    assert db.get_client() is not first
+    assert len(clients) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_its_own_client(clients):
+    parent = db.get_client()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            child = db.get_client()
+            ok = child is not parent and db.get_client() is child and not parent.closed
+            os.write(write_fd, b"1" if ok else b"0")
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    os.close(read_fd)
+    # The parent keeps using its own client
+    assert db.get_client() is parent
+    assert len(clients) == 1
@@ -0,0 +1,22 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from utils.db_indexes import ensure_indexes, legacy_roll_count  # noqa: E402
+
+
+def test_ensure_indexes_brings_roll_no_records_under_the_unique_index(mongomock_operators):
+    db = mongomock.MongoClient().db
+    db.attendance.insert_many([
+        {'roll_no': ' 7 ', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'},
+        {'roll_no': 8, 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'absent'},
+        {'roll': '9', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'},
+    ])
+    assert legacy_roll_count(db) == 2
+
+    ensure_indexes(db)
+
+    assert legacy_roll_count(db) == 0
+    assert sorted(d['roll'] for d in db.attendance.find()) == ['7', '8', '9']
+    # roll_no is kept for older readers
+    assert db.attendance.find_one({'roll': '7'})['roll_no'] == ' 7 '
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.encoding_store import EncodingStore, rebuild_classes, write_store  # noqa: E402
+
+
+def entry(roll, semester, branch, seed):
+    encoding = np.random.default_rng(seed).normal(size=128)
+    return encoding, {"roll": roll, "semester": semester, "branch": branch, "name": f"{roll}_{semester}_S_{branch}"}
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / "store.bin")
+    write_store(path, [entry("1", 3, "CSE", 1), entry("2", 3, "CSE", 2), entry("9", 5, "ECE", 9)])
+    return path
+
+
+def test_select_is_a_view_and_reports_missing_rolls(store_path):
+    store = EncodingStore(store_path)
+    assert store.refresh()
+    encodings, names, missing = store.select(3, "cse", ["1", "2", 3])
+    assert names == ["1_3_S_CSE", "2_3_S_CSE"]
+    assert missing == ["3"]
+    assert isinstance(encodings, np.memmap) and encodings.shape == (2, 128)
+    assert np.allclose(encodings[0], entry("1", 3, "CSE", 1)[0].astype(np.float32))
+    assert store.select(7, "CSE")[1] == []
+
+
+def test_rebuild_classes_keeps_other_classes(store_path):
+    rows = rebuild_classes(store_path, [(3, "CSE")], lambda: [entry("1", 3, "CSE", 1), entry("3", 3, "CSE", 3)])
+    assert rows == 3
+    store = EncodingStore(store_path)
+    store.refresh()
+    assert store.select(3, "CSE")[1] == ["1_3_S_CSE", "3_3_S_CSE"]
+    encodings, names, _ = store.select(5, "ECE")
+    assert names == ["9_5_S_ECE"]
+    assert np.allclose(encodings[0], entry("9", 5, "ECE", 9)[0].astype(np.float32))
+
+
+def test_registered_face_entries_matches_padded_branch():
+    mongomock = pytest.importorskip("mongomock")
+    from utils.registered_faces import registered_face_entries, store_encoding
+
+    db = mongomock.MongoClient().db
+    ids = db.students.insert_many([
+        {'roll_no': '1', 'name': 'Asha', 'semester': 3, 'branch': 'CSE '},
+        {'roll_no': '2', 'name': 'Ravi', 'semester': 3, 'branch': 'ECE'},
+    ]).inserted_ids
+    for i, student_id in enumerate(ids):
+        store_encoding(db, student_id, np.full(128, i, dtype='<f8'))
+
+    entries = registered_face_entries(db, [(3, ' cse')])
+    assert [meta['roll'] for _, meta in entries] == ['1']
@@ -0,0 +1,50 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.face_index import BruteForceIndex, IVFIndex, build_index, recall_at_k  # noqa: E402
+
+
+def make_gallery(n, rng):
+    # Same shape as benchmarks/bench_index.py: tight blobs around identity centres
+    centres = rng.normal(0, 0.1, size=(max(1, n // 4), 128))
+    return centres[rng.integers(0, len(centres), n)] + rng.normal(0, 0.02, size=(n, 128))
+
+
+@pytest.fixture
+def gallery():
+    rng = np.random.default_rng(0)
+    data = make_gallery(2000, rng)
+    queries = data[rng.choice(len(data), 100, replace=False)] + rng.normal(0, 0.01, size=(100, 128))
+    return data, queries
+
+
+def test_exact_index_matches_numpy(gallery):
+    data, queries = gallery
+    indices, distances = BruteForceIndex(data).search(queries, k=3)
+    expected = np.linalg.norm(data[None, :, :] - queries[:, None, :], axis=2)
+    assert np.array_equal(indices[:, 0], expected.argmin(axis=1))
+    assert np.allclose(distances, np.sort(expected, axis=1)[:, :3], atol=1e-4)
+
+
+def test_ivf_recall_against_exact(gallery):
+    data, queries = gallery
+    exact = BruteForceIndex(data)
+    ivf = IVFIndex(data, n_probe=8)
+    # The nearest identity lies in the query's own blob, which a few probes find
+    assert recall_at_k(ivf, exact, queries, k=1) >= 0.95
+    # Probing every cell is an exhaustive scan
+    ivf.n_probe = ivf.n_lists
+    assert recall_at_k(ivf, exact, queries, k=5) == 1.0
+
+
+def test_small_gallery_pads_missing_slots():
+    index = build_index(np.zeros((2, 128)), kind="ivf")
+    indices, distances = index.search(np.zeros((1, 128)), k=4)
+    assert list(indices[0, 2:]) == [-1, -1]
+    assert np.isinf(distances[0, 2:]).all()
+
+
+def test_unknown_index_kind():
+    with pytest.raises(ValueError):
+        build_index(np.zeros((1, 128)), kind="hnsw")
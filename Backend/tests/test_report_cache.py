@@ -0,0 +1,64 @@
+from utils.report_cache import ReportCache
+
+SCOPE = {'semester': 5, 'branch': 'CSE', 'start_date': '2024-03-01', 'end_date': '2024-03-31'}
+
+
+def test_lru_eviction_keeps_size_under_budget():
+    cache = ReportCache(max_bytes=10)
+    cache.put('a', b'aaaa', 4, **SCOPE)
+    cache.put('b', b'bbbb', 4, **SCOPE)
+    assert cache.get('a') == b'aaaa'  # a is now the most recently used
+    cache.put('c', b'cccc', 4, **SCOPE)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'aaaa' and cache.get('c') == b'cccc'
+    assert cache.size == 8
+    assert cache.snapshot()['evictions'] == 1
+
+
+def test_oversized_and_expired_entries_are_not_served():
+    cache = ReportCache(max_bytes=10, ttl=-1)
+    cache.put('big', b'x' * 11, 11, **SCOPE)
+    cache.put('old', b'x', 1, **SCOPE)
+
+    assert cache.get('big') is None
+    assert cache.get('old') is None
+    assert cache.snapshot()['expired'] == 1
+
+
+def test_invalidate_matches_semester_branch_and_dates():
+    cache = ReportCache()
+    cache.put('cse', b'1', 1, **SCOPE)
+    cache.put('ece', b'2', 1, **dict(SCOPE, branch='ECE'))
+    cache.put('all branches', b'3', 1, **dict(SCOPE, branch=None))
+    cache.put('april', b'4', 1, **dict(SCOPE, start_date='2024-04-01', end_date='2024-04-30'))
+
+    assert cache.invalidate(semester='5', branch=' cse ', dates=['2024-03-15']) == 2
+    assert cache.get('cse') is None and cache.get('all branches') is None
+    assert cache.get('ece') == b'2' and cache.get('april') == b'4'
+
+
+def test_put_skips_reports_read_before_an_invalidation():
+    cache = ReportCache()
+    generation = cache.generation(5, 'CSE')
+    cache.invalidate(semester=5, branch='ECE')
+    cache.put('unaffected', b'1', 1, **SCOPE, generation=generation)
+    assert cache.get('unaffected') == b'1'
+
+    generation = cache.generation(5, 'CSE')
+    # A write lands while the report is being built
+    cache.invalidate(semester=5, branch='cse', dates=['2024-03-02'])
+    cache.put('stale', b'2', 1, **SCOPE, generation=generation)
+    assert cache.get('stale') is None
+    assert cache.snapshot()['stale'] == 1
+
+    # A semester-wide invalidation affects every branch
+    generation = cache.generation(5, 'CSE')
+    cache.invalidate(semester=5)
+    cache.put('stale', b'3', 1, **SCOPE, generation=generation)
+    assert cache.get('stale') is None
+
+
+def test_make_key_is_order_independent():
+    assert ReportCache.make_key(semester=5, branch='CSE') == ReportCache.make_key(branch='CSE', semester=5)
+    assert ReportCache.make_key(semester=5, subject='cs301') != ReportCache.make_key(semester=5, subject='CS301')
@@ -0,0 +1,88 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+mongomock = pytest.importorskip("mongomock")
+
+from utils.report_aggregation import aggregate_attendance, attendance_marks  # noqa: E402
+from utils.report_engine import (  # noqa: E402
+    aggregate_records, daily_report, student_roll, subject_report, summary_report
+)
+from utils.report_export import chunked  # noqa: E402
+
+START, END = '2024-03-01', '2024-03-05'
+SUBJECTS = ['CS301', 'CS302']
+
+STUDENTS = [
+    {'roll_no': '1', 'name': 'Asha', 'branch': 'CSE'},
+    {'roll_no': '2', 'name': 'Ravi', 'branch': 'CSE'},
+    {'roll': '3', 'name': 'Meena', 'branch': 'CSE'},
+    {'roll_no': '4', 'name': 'Kiran', 'branch': 'CSE'},
+]
+
+# Mixed roll fields, padding, status casing and a duplicate mark, as found
+# in real attendance collections
+RECORDS = [
+    {'roll_no': '1', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'Present'},
+    {'roll_no': ' 1 ', 'subject_code': 'CS301', 'date': '2024-03-01', 'status': 'present'},
+    {'roll_no': '1', 'subject_code': 'CS301', 'date': '2024-03-02', 'status': 'present'},
+    {'roll': '2', 'subject_code': 'CS301', 'date': '2024-03-02', 'status': 'absent'},
+    {'roll_no': '', 'roll': '3', 'subject_code': 'CS301', 'date': '2024-03-03', 'status': 'PRESENT'},
+    {'roll_no': '2', 'subject_code': 'CS302', 'date': '2024-03-04', 'status': 'present'},
+    {'roll_no': '4', 'subject_code': 'CS302', 'date': '2024-03-05', 'status': None},
+    {'roll_no': '9', 'subject_code': 'CS302', 'date': '2024-03-05', 'status': 'present'},
+    {'roll_no': '1', 'subject_code': 'CS303', 'date': '2024-03-05', 'status': 'present'},
+]
+
+
+@pytest.fixture
+def attendance(mongomock_operators):
+    collection = mongomock.MongoClient().db.attendance
+    collection.insert_many([dict(r, semester=5, branch='CSE') for r in RECORDS])
+    return collection
+
+
+def sheets(aggregates):
+    return ([daily_report(STUDENTS, aggregates, SUBJECTS, START, END)]
+            + list(summary_report(STUDENTS, aggregates, SUBJECTS))
+            + [subject_report(STUDENTS, aggregates, code) for code in SUBJECTS])
+
+
+def test_pipeline_matches_python_aggregation(attendance):
+    query = {'semester': 5, 'date': {'$gte': START, '$lte': END}}
+    python = aggregate_records(list(attendance.find(query)))
+    mongo = aggregate_attendance(attendance, query, include_marks=True)
+
+    assert mongo['classes_held'] == python['classes_held']
+    for key in ('present_counts', 'marks'):
+        columns = list(python[key].columns)
+        expected = python[key].sort_values(columns).reset_index(drop=True)
+        actual = mongo[key].sort_values(columns).reset_index(drop=True)
+        assert actual.astype(expected.dtypes.to_dict()).equals(expected), key
+
+    for got, want in zip(sheets(mongo), sheets(python)):
+        assert got.equals(want)
+
+
+def test_empty_range(attendance):
+    query = {'semester': 5, 'date': {'$gte': '2025-01-01', '$lte': '2025-01-31'}}
+    mongo = aggregate_attendance(attendance, query, include_marks=True)
+    assert mongo['classes_held'] == {}
+    assert mongo['present_counts'].empty and mongo['marks'].empty
+    for got, want in zip(sheets(mongo), sheets(aggregate_records([]))):
+        assert got.equals(want)
+
+
+def test_marks_per_chunk_match_full_marks(attendance):
+    query = {'semester': 5, 'date': {'$gte': START, '$lte': END}}
+    full = aggregate_attendance(attendance, query, include_marks=True)['marks']
+    chunks = [attendance_marks(attendance, query, [student_roll(s) for s in chunk])
+              for chunk in chunked(STUDENTS, size=2)]
+    rolls = {student_roll(s) for s in STUDENTS}
+    expected = full[full['roll'].isin(rolls)].sort_values(['roll', 'subject_code', 'date']).reset_index(drop=True)
+    actual = pd.concat(chunks).sort_values(['roll', 'subject_code', 'date']).reset_index(drop=True)
+    assert actual.equals(expected)
+    # The daily sheet comes out the same when built chunk by chunk
+    whole = daily_report(STUDENTS, {'marks': full}, SUBJECTS, START, END)
+    parts = pd.concat([daily_report(chunk, {'marks': marks}, SUBJECTS, START, END)
+                       for chunk, marks in zip(chunked(STUDENTS, size=2), chunks)], ignore_index=True)
+    assert parts.equals(whole)
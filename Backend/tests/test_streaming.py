@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("flask")
+mongomock = pytest.importorskip("mongomock")
+
+from bson.objectid import ObjectId  # noqa: E402
+
+from utils.streaming import MAX_PAGE_SIZE, find_page, parse_list_args  # noqa: E402
+
+
+@pytest.mark.parametrize("args, message", [
+    ({'limit': '0'}, "limit must be between"),
+    ({'limit': str(MAX_PAGE_SIZE + 1)}, "limit must be between"),
+    ({'limit': 'ten'}, "limit must be an integer"),
+    ({'limit': '2.5'}, "limit must be an integer"),
+    ({'after': 'not-an-object-id'}, "Invalid resume token"),
+    ({'format': 'xml'}, "format must be json or ndjson"),
+])
+def test_parse_list_args_rejects_bad_input(args, message):
+    with pytest.raises(ValueError, match=message):
+        parse_list_args(args)
+
+
+def test_parse_list_args_defaults_and_projection():
+    assert parse_list_args({}) == {'limit': None, 'after': None, 'projection': None, 'format': 'json'}
+    options = parse_list_args({'fields': 'name, roll_no,,', 'format': 'NDJSON'})
+    assert options['projection'] == {'name': 1, 'roll_no': 1, '_id': 1}
+    assert options['format'] == 'ndjson'
+
+
+def test_find_page_resumes_after_cursor():
+    collection = mongomock.MongoClient().db.students
+    ids = collection.insert_many([{'roll_no': str(i), 'semester': 3} for i in range(5)]).inserted_ids
+    collection.insert_one({'roll_no': '99', 'semester': 4})
+
+    first = list(find_page(collection, {'semester': 3}, parse_list_args({'limit': '2'})))
+    assert [d['_id'] for d in first] == ids[:2]
+
+    rest = list(find_page(collection, {'semester': 3},
+                          parse_list_args({'limit': '10', 'after': str(first[-1]['_id'])})))
+    assert [d['_id'] for d in rest] == ids[2:]
+
+    # Resuming past the last document gives an empty page
+    assert list(find_page(collection, {}, parse_list_args({'after': str(ObjectId())}))) == []
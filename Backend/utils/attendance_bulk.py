@@ -0,0 +1,145 @@
+import datetime
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+REQUIRED_FIELDS = ('subject_code', 'date')
+# Fields a manual mark may set; anything else in the request is ignored
+MARK_FIELDS = ('name', 'branch', 'semester', 'subject_code', 'date', 'status')
+
+
+def resolve_subjects(subjects_collection, codes):
+    """{code: subject} for every distinct code, in a single $in query."""
+    codes = sorted({c for c in codes if c is not None})
+    if not codes:
+        return {}
+    cursor = subjects_collection.find({'code': {'$in': codes}}, {'_id': 0, 'code': 1, 'name': 1, 'semester': 1})
+    return {s['code']: s for s in cursor}
+
+
+def record_key(record):
+    """(roll, subject_code, date) of an incoming record; roll may be sent as roll or roll_no."""
+    roll = record.get('roll') or record.get('roll_no')
+    roll = str(roll).strip() if roll is not None else ''
+    return roll, record.get('subject_code'), record.get('date')
+
+
+def mark_filter(roll, subject_code, date):
+    """
+    Filter for the existing mark of (roll, subject_code, date). Older records
+    carry the roll as roll_no only; matching both fields updates them (and
+    sets roll on them) instead of inserting a duplicate next to them.
+    """
+    return {'subject_code': subject_code, 'date': date, '$or': [{'roll': roll}, {'roll_no': roll}]}
+
+
+def clean_mark(data, roster, required):
+    """
+    Validate a manually entered mark. Returns (record, None) with the roll
+    and semester normalized and only MARK_FIELDS kept, or
+    (None, (message, http_status)).
+    """
+    if not isinstance(data, dict) or not all(field in data and data[field] for field in required):
+        return None, ('Missing required fields', 400)
+    try:
+        datetime.datetime.strptime(str(data['date']), '%Y-%m-%d')
+    except ValueError:
+        return None, ('Invalid date format', 400)
+    roll = record_key(data)[0]
+    if not roll or not roster.contains(roll):
+        return None, ('Student not found in database', 404)
+    record = {field: data[field] for field in MARK_FIELDS if field in data}
+    if 'semester' in record:
+        # Forms send "3"; reports and rollups match the stored integer
+        try:
+            record['semester'] = int(str(record['semester']).strip())
+        except ValueError:
+            return None, ('Semester must be a number', 400)
+    record['roll'] = roll
+    return record, None
+
+
+def upsert_mark(collection, record):
+    """
+    Write one mark with a single upsert on (roll, subject_code, date), the
+    attendance unique key. Returns 'upserted' or 'updated'.
+    """
+    result = collection.update_one(
+        mark_filter(record['roll'], record['subject_code'], record['date']),
+        {'$set': record},
+        upsert=True
+    )
+    return 'upserted' if result.upserted_id is not None else 'updated'
+
+
+def bulk_upsert_attendance(collection, records, subjects):
+    """
+    Upsert records keyed on (roll, subject_code, date) with one unordered
+    bulk_write. Resubmitting a day updates the existing records instead of
+    duplicating them. Copies of the records are enriched with subject_name
+    and semester from subjects; the caller's dicts are left untouched.
+
+    Returns (results, counts, written): one result per input record, in
+    input order, with status 'upserted', 'updated', 'duplicate' (a later
+    record in the same batch has the same key and wins), 'invalid' or
+    'failed', and the field sets that were written.
+    """
+    results = [None] * len(records)
+    latest = {}  # key -> index of the last record with that key
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            results[i] = {'index': i, 'status': 'invalid', 'error': 'Record must be an object'}
+            continue
+        roll, subject_code, date = key = record_key(record)
+        missing = [f for f, v in zip(('roll',) + REQUIRED_FIELDS, key) if not v]
+        if missing:
+            results[i] = {'index': i, 'status': 'invalid', 'error': f"Missing {', '.join(missing)}"}
+            continue
+        if key in latest:
+            j = latest[key]
+            results[j] = {'index': j, 'status': 'duplicate', 'superseded_by': i}
+        latest[key] = i
+
+    indices = sorted(latest.values())
+    operations, documents = [], []
+    for i in indices:
+        roll, subject_code, date = record_key(records[i])
+        fields = {k: v for k, v in records[i].items() if k not in ('_id', 'roll_no')}
+        subject = subjects.get(subject_code)
+        if subject:
+            fields['subject_name'] = subject['name']
+            fields['semester'] = subject['semester']
+        else:
+            results[i] = {'index': i, 'warning': 'Unknown subject_code'}
+        fields['roll'] = roll
+        documents.append(fields)
+        operations.append(UpdateOne(mark_filter(roll, subject_code, date), {'$set': fields}, upsert=True))
+
+    errors = {}
+    upserted = {}
+    if operations:
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as e:
+            # Unordered: every operation not listed in writeErrors went through
+            errors = {err['index']: err.get('errmsg', 'write error') for err in e.details.get('writeErrors', [])}
+            upserted = {u['index']: u['_id'] for u in e.details.get('upserted', [])}
+
+    written = []
+    for op_index, i in enumerate(indices):
+        entry = results[i] or {'index': i}
+        if op_index in errors:
+            entry.update(status='failed', error=errors[op_index])
+        elif op_index in upserted:
+            entry.update(status='upserted', id=str(upserted[op_index]))
+        else:
+            entry['status'] = 'updated'
+        if op_index not in errors:
+            written.append(documents[op_index])
+        results[i] = entry
+
+    counts = {}
+    for entry in results:
+        counts[entry['status']] = counts.get(entry['status'], 0) + 1
+    return results, counts, written
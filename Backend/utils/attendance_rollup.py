@@ -0,0 +1,274 @@
+import datetime
+
+import pandas as pd
+from pymongo import UpdateOne
+
+from utils.report_aggregation import _ROLL, _STATUS
+
+# One document per (semester, branch, subject_code, roll): days {date: status}
+# plus present, absent, total and last_seen derived from it.
+ROLLUP_COLLECTION = 'attendance_rollups'
+# One document per (semester, branch, subject_code): days {date: true} for
+# every day the class has attendance records.
+CLASS_COLLECTION = 'class_rollups'
+# Written by rebuild_rollups. Incremental updates start creating rollup
+# documents as soon as the code is deployed, so only this marker (not a
+# non-empty collection) says the rollups also cover the older records.
+ROLLUP_STATE_COLLECTION = 'rollup_state'
+BUILT_MARKER = 'built'
+# Marks are $set per day rather than $inc'ed, so replaying a write (retries,
+# resubmitted batches, capture flushes) is idempotent and needs no
+# before-image of the attendance record.
+
+_ENTRIES = {'$objectToArray': '$days'}
+_PRESENT = {'$filter': {'input': _ENTRIES, 'cond': {'$eq': ['$$this.v', 'present']}}}
+
+# Derived counters, recomputed from days after every change
+_RECOUNT = {'$set': {
+    'total': {'$size': _ENTRIES},
+    'present': {'$size': _PRESENT},
+    'absent': {'$subtract': [{'$size': _ENTRIES}, {'$size': _PRESENT}]},
+    'last_seen': {'$max': {'$map': {'input': _PRESENT, 'in': '$$this.k'}}},
+}}
+
+
+def _roll_status(record):
+    """(roll, status) of an attendance record, normalized like report_engine."""
+    roll = str(record.get('roll_no') or record.get('roll', '')).strip()
+    status = str(record.get('status') or '').lower()
+    return roll, status
+
+
+def _mark(record):
+    """(scope, roll, date, status) of an attendance record."""
+    scope = {'semester': record.get('semester'), 'branch': record.get('branch'),
+             'subject_code': record.get('subject_code')}
+    roll, status = _roll_status(record)
+    return scope, roll, record.get('date'), status
+
+
+def _valid(scope, date):
+    return scope['subject_code'] is not None and isinstance(date, str) and date
+
+
+def _set_day(scope, roll, date, status):
+    day = {'$arrayToObject': {'$literal': [{'k': date, 'v': status}]}}
+    return UpdateOne(dict(scope, roll=roll), [
+        {'$set': {'days': {'$mergeObjects': [{'$ifNull': ['$days', {}]}, day]}}},
+        _RECOUNT,
+    ], upsert=True)
+
+
+def _drop_day(scope, roll, date):
+    keep = {'$ne': ['$$this.k', {'$literal': date}]}
+    return UpdateOne(dict(scope, roll=roll), [
+        {'$set': {'days': {'$arrayToObject': {'$filter': {'input': _ENTRIES, 'cond': keep}}}}},
+        _RECOUNT,
+    ])
+
+
+def _write(db, student_ops, class_ops):
+    if student_ops:
+        db[ROLLUP_COLLECTION].bulk_write(student_ops, ordered=False)
+    if class_ops:
+        db[CLASS_COLLECTION].bulk_write(class_ops, ordered=False)
+
+
+def _resync(db, days):
+    """
+    Re-derive rollup days from the attendance records that remain.
+    days maps (semester, branch, subject_code, date) to the rolls to check.
+    A student's day keeps the status of a remaining record (an older roll_no
+    duplicate, say) and is dropped when none is left; a class day is dropped
+    once no record for it remains.
+    """
+    student_ops, class_ops = [], []
+    for (semester, branch, subject_code, date), rolls in days.items():
+        scope = {'semester': semester, 'branch': branch, 'subject_code': subject_code}
+        remaining = {}
+        found = False
+        for record in db['attendance'].find(dict(scope, date=date), {'_id': 0, 'roll': 1, 'roll_no': 1, 'status': 1}):
+            found = True
+            # Duplicates collapse to the last one, as in rebuild_rollups
+            roll, status = _roll_status(record)
+            remaining[roll] = status
+        for roll in rolls:
+            if roll in remaining:
+                student_ops.append(_set_day(scope, roll, date, remaining[roll]))
+            else:
+                student_ops.append(_drop_day(scope, roll, date))
+        if not found:
+            class_ops.append(UpdateOne(scope, {'$unset': {f'days.{date}': ''}}))
+    _write(db, student_ops, class_ops)
+
+
+def _moved_days(db, marks):
+    """
+    Days of marks that the rollups still hold under another scope: an update
+    that changed a record's semester or branch leaves the old day behind.
+    marks are (scope, roll, date) of written records.
+    """
+    written = {(roll, scope['subject_code'], date): scope for scope, roll, date in marks}
+    clauses = [{'roll': roll, 'subject_code': subject_code, f'days.{date}': {'$exists': True}}
+               for roll, subject_code, date in written]
+    moved = {}
+    if not clauses:
+        return moved
+    for doc in db[ROLLUP_COLLECTION].find({'$or': clauses}, {'_id': 0}):
+        old = (doc.get('semester'), doc.get('branch'), doc['subject_code'])
+        for date in doc.get('days', {}):
+            scope = written.get((doc['roll'], doc['subject_code'], date))
+            if scope and (scope['semester'], scope['branch'], scope['subject_code']) != old:
+                moved.setdefault(old + (date,), set()).add(doc['roll'])
+    return moved
+
+
+def record_marks(db, records):
+    """Fold written (inserted, upserted or updated) attendance records into the rollups."""
+    student_ops, class_ops, marks = [], [], []
+    for record in records:
+        scope, roll, date, status = _mark(record)
+        if not _valid(scope, date):
+            continue
+        class_ops.append(UpdateOne(scope, {'$set': {f'days.{date}': True}}, upsert=True))
+        if roll:
+            student_ops.append(_set_day(scope, roll, date, status))
+            marks.append((scope, roll, date))
+    _write(db, student_ops, class_ops)
+    moved = _moved_days(db, marks)
+    if moved:
+        _resync(db, moved)
+
+
+def forget_marks(db, records):
+    """Remove deleted attendance records from the rollups (see _resync)."""
+    days = {}
+    for record in records:
+        scope, roll, date, _ = _mark(record)
+        if not _valid(scope, date):
+            continue
+        rolls = days.setdefault((scope['semester'], scope['branch'], scope['subject_code'], date), set())
+        if roll:
+            rolls.add(roll)
+    _resync(db, days)
+
+
+def _scope_group():
+    return {'semester': '$semester', 'branch': '$branch', 'subject_code': '$subject_code'}
+
+
+def rebuild_rollups(db):
+    """
+    Recompute both rollup collections from the attendance records. Each is
+    built into a temporary collection and renamed over the old one, so
+    readers never see a half-built rollup. Returns {collection: documents}.
+    """
+    base = [
+        {'$match': {'subject_code': {'$ne': None}, 'date': {'$type': 'string', '$ne': ''}}},
+        {'$project': {'_id': 0, 'semester': 1, 'branch': 1, 'subject_code': 1, 'date': 1,
+                      'roll': _ROLL, 'status': _STATUS}},
+    ]
+    students = base + [
+        {'$match': {'roll': {'$ne': ''}}},
+        # Duplicate records for the same day collapse to one entry, as in record_marks
+        {'$group': {'_id': dict(_scope_group(), roll='$roll'),
+                    'days': {'$push': {'k': '$date', 'v': '$status'}}}},
+        {'$project': {'_id': 0, 'semester': '$_id.semester', 'branch': '$_id.branch',
+                      'subject_code': '$_id.subject_code', 'roll': '$_id.roll',
+                      'days': {'$arrayToObject': '$days'}}},
+        _RECOUNT,
+    ]
+    classes = base + [
+        {'$group': {'_id': _scope_group(), 'dates': {'$addToSet': '$date'}}},
+        {'$project': {'_id': 0, 'semester': '$_id.semester', 'branch': '$_id.branch',
+                      'subject_code': '$_id.subject_code',
+                      'days': {'$arrayToObject': {'$map': {'input': '$dates', 'in': {'k': '$$this', 'v': True}}}}}},
+    ]
+
+    counts = {}
+    for name, pipeline in ((ROLLUP_COLLECTION, students), (CLASS_COLLECTION, classes)):
+        staging = f'{name}_rebuild'
+        db['attendance'].aggregate(pipeline + [{'$out': staging}], allowDiskUse=True)
+        if staging in db.list_collection_names():
+            db[staging].rename(name, dropTarget=True)
+        else:
+            db[name].drop()
+        counts[name] = db[name].count_documents({})
+    db[ROLLUP_STATE_COLLECTION].replace_one(
+        {'_id': BUILT_MARKER}, {'built_at': datetime.datetime.now(), 'counts': counts}, upsert=True
+    )
+    return counts
+
+
+def rollups_built(db):
+    """True once rebuild_rollups has backfilled the rollups from the attendance records."""
+    return db[ROLLUP_STATE_COLLECTION].find_one({'_id': BUILT_MARKER}, {'_id': 1}) is not None
+
+
+def _rollup_filter(query):
+    return {k: query[k] for k in ('semester', 'branch', 'subject_code') if k in query}
+
+
+def rollup_aggregates(db, query, start_date, end_date):
+    """
+    classes_held and present_counts (as in report_engine.aggregate_records)
+    for an attendance query over [start_date, end_date], read from the
+    rollups: O(students x subjects) documents instead of every record.
+    Raises LookupError until rebuild_rollups has run.
+    """
+    if not rollups_built(db):
+        raise LookupError('Attendance rollups have not been built; run "flask rebuild-rollups"')
+    match = _rollup_filter(query)
+    start_date, end_date = str(start_date), str(end_date)
+
+    held = {}
+    for doc in db[CLASS_COLLECTION].find(match, {'_id': 0, 'subject_code': 1, 'days': 1}):
+        days = [d for d in doc.get('days', {}) if start_date <= d <= end_date]
+        held.setdefault(doc['subject_code'], set()).update(days)
+
+    in_range = {'$and': [{'$eq': ['$$this.v', 'present']},
+                         {'$gte': ['$$this.k', start_date]}, {'$lte': ['$$this.k', end_date]}]}
+    present = db[ROLLUP_COLLECTION].aggregate([
+        {'$match': match},
+        {'$project': {'_id': 0, 'roll': 1, 'subject_code': 1,
+                      'count': {'$size': {'$filter': {'input': _ENTRIES, 'cond': in_range}}}}},
+        {'$match': {'count': {'$gt': 0}}},
+    ])
+    present_counts = pd.DataFrame(list(present), columns=['roll', 'subject_code', 'count'])
+    return {
+        'classes_held': {code: len(days) for code, days in held.items() if days},
+        'present_counts': present_counts.groupby(['roll', 'subject_code'], as_index=False)['count'].sum(),
+        'marks': pd.DataFrame(columns=['roll', 'subject_code', 'date']),
+    }
+
+
+def student_attendance(db, roll, semester, branch=None):
+    """
+    Per-subject totals for one student in a semester, from the rollups.
+    Raises LookupError until rebuild_rollups has run.
+    """
+    if not rollups_built(db):
+        raise LookupError('Attendance rollups have not been built; run "flask rebuild-rollups"')
+    match = {'roll': str(roll).strip(), 'semester': semester}
+    if branch:
+        match['branch'] = branch
+    class_match = {k: v for k, v in match.items() if k != 'roll'}
+    held = {}
+    for doc in db[CLASS_COLLECTION].find(class_match, {'_id': 0, 'subject_code': 1, 'days': 1}):
+        held.setdefault(doc['subject_code'], set()).update(doc.get('days', {}))
+
+    subjects = {}
+    for doc in db[ROLLUP_COLLECTION].find(match, {'_id': 0, 'days': 0}):
+        row = subjects.setdefault(doc['subject_code'], {
+            'subject_code': doc['subject_code'], 'present': 0, 'absent': 0, 'last_seen': None
+        })
+        row['present'] += doc.get('present', 0)
+        row['absent'] += doc.get('absent', 0)
+        if doc.get('last_seen') and (row['last_seen'] is None or doc['last_seen'] > row['last_seen']):
+            row['last_seen'] = doc['last_seen']
+
+    for code, row in subjects.items():
+        classes_held = len(held.get(code, ()))
+        row['classes_held'] = classes_held
+        row['percentage'] = round(row['present'] / classes_held * 100, 2) if classes_held else 0
+    return sorted(subjects.values(), key=lambda row: str(row['subject_code']))
@@ -0,0 +1,162 @@
+import datetime
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Session states
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+STOPPED = "stopped"
+TIMED_OUT = "timed_out"
+FAILED = "failed"
+
+FINISHED_STATES = (COMPLETED, STOPPED, TIMED_OUT, FAILED)
+
+
+class SessionLimitError(Exception):
+    """Raised when the maximum number of concurrent sessions is running."""
+
+
+class SessionConflictError(Exception):
+    """Raised when a session is already running for the same class and subject."""
+
+
+class AttendanceSession:
+    """
+    One background attendance capture.
+    The capture loop reports progress through mark_present()/set_expected()
+    and checks should_stop() every frame; pollers read to_dict().
+    """
+
+    def __init__(self, params, max_duration, key=None):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.key = key
+        self.status = PENDING
+        self.created_at = datetime.datetime.now()
+        self.started_monotonic = time.monotonic()
+        self.deadline = self.started_monotonic + max_duration
+        self.finished_at = None
+        self.expected = 0
+        self.present = []
+        self.result = None
+        self.error = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def set_expected(self, count):
+        with self._lock:
+            self.expected = count
+
+    def mark_present(self, roll_no):
+        with self._lock:
+            self.present.append(roll_no)
+
+    def request_stop(self):
+        self._stop_event.set()
+
+    def should_stop(self):
+        return self._stop_event.is_set() or time.monotonic() >= self.deadline
+
+    def stop_reason(self):
+        """Final state for a loop that exited because should_stop() was true."""
+        if self._stop_event.is_set():
+            return STOPPED
+        if time.monotonic() >= self.deadline:
+            return TIMED_OUT
+        return COMPLETED
+
+    def to_dict(self):
+        with self._lock:
+            present_count = len(self.present)
+            return {
+                "session_id": self.id,
+                "status": self.status,
+                "subject_code": self.params.get("subject_code"),
+                "semester": self.params.get("semester"),
+                "branch": self.params.get("branch"),
+                "started_at": self.created_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "elapsed_seconds": round(time.monotonic() - self.started_monotonic, 1),
+                "present_count": present_count,
+                "absent_count": max(0, self.expected - present_count),
+                "students_present": list(self.present),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class SessionManager:
+    """
+    Runs attendance sessions on a bounded thread pool so the HTTP request
+    that starts one returns immediately.
+    Finished sessions are kept for `retention` seconds for polling.
+    """
+
+    def __init__(self, max_concurrent=2, max_duration=600, retention=3600):
+        self.max_concurrent = max_concurrent
+        self.max_duration = max_duration
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="attendance-session")
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def active_count(self):
+        with self._lock:
+            return sum(1 for s in self._sessions.values() if s.status not in FINISHED_STATES)
+
+    def start(self, target, params, key=None):
+        """
+        Schedule target(session) in the background and return the session.
+        target returns the result dict; raising marks the session failed.
+        Only one unfinished session may hold a given key, e.g.
+        (semester, branch, subject_code), so one class is not captured twice.
+        """
+        with self._lock:
+            self._prune()
+            active = [s for s in self._sessions.values() if s.status not in FINISHED_STATES]
+            if key is not None:
+                running = next((s for s in active if s.key == key), None)
+                if running:
+                    raise SessionConflictError(f"session {running.id} is already running for {key}")
+            if len(active) >= self.max_concurrent:
+                raise SessionLimitError(f"{len(active)} attendance sessions already running")
+            session = AttendanceSession(params, self.max_duration, key)
+            self._sessions[session.id] = session
+
+        self._executor.submit(self._run, target, session)
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def stop(self, session_id):
+        session = self.get(session_id)
+        if session:
+            session.request_stop()
+        return session
+
+    def _run(self, target, session):
+        session.status = RUNNING
+        try:
+            session.result = target(session)
+            session.status = session.stop_reason()
+        except Exception as e:
+            logger.error(f"Attendance session {session.id} failed: {e}")
+            session.error = str(e)
+            session.status = FAILED
+        finally:
+            session.finished_at = datetime.datetime.now()
+
+    def _prune(self):
+        cutoff = datetime.datetime.now() - datetime.timedelta(seconds=self.retention)
+        expired = [sid for sid, s in self._sessions.items()
+                   if s.status in FINISHED_STATES and s.finished_at and s.finished_at < cutoff]
+        for sid in expired:
+            del self._sessions[sid]
@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from utils.attendance_bulk import mark_filter
+
+logger = logging.getLogger(__name__)
+
+
+class AttendanceWriteError(RuntimeError):
+    """Raised by close() when some writes could not be made after every retry."""
+
+    def __init__(self, failed):
+        super().__init__(f"{len(failed)} attendance writes failed: {[key[0] for key in failed]}")
+        self.failed = failed
+
+
+class AttendanceWriteBuffer:
+    """
+    Buffers attendance upserts made during a capture session and flushes
+    them as one unordered bulk_write from a background thread, so the
+    capture loop never waits on a database round-trip.
+    Writes are keyed by (roll, subject_code, date): re-adding a key before it
+    is flushed replaces the pending write, and the upsert makes a retried
+    flush idempotent, so each key ends up written exactly once.
+    A flush happens every flush_interval seconds, as soon as flush_count
+    writes are pending, and on close(), which raises AttendanceWriteError
+    if any write was given up on.
+    """
+
+    def __init__(self, collection, flush_interval=2.0, flush_count=25, max_retries=3, retry_delay=0.5,
+                 on_flush=None):
+        self.collection = collection
+        # Called with the records (key fields included) written by each flush
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.stats = {"queued": 0, "written": 0, "flushes": 0, "retries": 0, "failed": 0}
+        self.failed = []  # (roll, subject_code, date) keys given up on
+
+        self._pending = {}  # (roll, subject_code, date) -> $set document
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, roll, subject_code, date, fields):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Attendance write buffer is closed")
+            self._pending[(roll, subject_code, date)] = fields
+            self.stats["queued"] += 1
+            if len(self._pending) >= self.flush_count:
+                self._cond.notify()
+
+    def close(self):
+        """
+        Stop the flusher and write whatever is still pending. Returns the
+        stats; raises AttendanceWriteError (once) if any write failed.
+        """
+        with self._cond:
+            reported = self._closed
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        if self.failed and not reported:
+            raise AttendanceWriteError(self.failed)
+        return self.stats
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.flush_count:
+                    self._cond.wait(timeout=self.flush_interval)
+                batch = self._pending
+                self._pending = {}
+                closing = self._closed
+            if batch:
+                self._flush(batch)
+            if closing:
+                with self._cond:
+                    batch = self._pending
+                    self._pending = {}
+                if batch:
+                    self._flush(batch)
+                return
+
+    def _flush(self, batch):
+        keys = list(batch)
+        written = []
+        for attempt in range(self.max_retries + 1):
+            operations = [
+                UpdateOne(mark_filter(roll, subject_code, date),
+                          {'$set': dict(batch[(roll, subject_code, date)], roll=roll)}, upsert=True)
+                for roll, subject_code, date in keys
+            ]
+            try:
+                self.collection.bulk_write(operations, ordered=False)
+                self.stats["written"] += len(keys)
+                self.stats["flushes"] += 1
+                self._notify(batch, written + keys)
+                return
+            except BulkWriteError as e:
+                # Unordered: everything except the reported errors went through
+                failed = {err['index'] for err in e.details.get('writeErrors', [])}
+                self.stats["written"] += len(keys) - len(failed)
+                written += [key for i, key in enumerate(keys) if i not in failed]
+                keys = [key for i, key in enumerate(keys) if i in failed]
+                logger.warning(f"Attendance bulk write: {len(failed)} of {len(operations)} failed: {e}")
+            except PyMongoError as e:
+                logger.warning(f"Attendance bulk write failed (attempt {attempt + 1}): {e}")
+
+            if not keys:
+                self.stats["flushes"] += 1
+                self._notify(batch, written)
+                return
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                time.sleep(self.retry_delay * (2 ** attempt))
+
+        self.stats["failed"] += len(keys)
+        self.failed += keys
+        logger.error(f"❌ Gave up writing attendance for: {[key[0] for key in keys]}")
+        self._notify(batch, written)
+
+    def _notify(self, batch, keys):
+        if self.on_flush and keys:
+            records = [dict(batch[key], roll=key[0], subject_code=key[1], date=key[2]) for key in keys]
+            try:
+                self.on_flush(records)
+            except Exception as e:
+                logger.warning(f"Attendance flush callback failed: {e}")
@@ -0,0 +1,221 @@
+import csv
+import datetime
+import io
+import os
+import shutil
+import zipfile
+
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+from utils.face_recognition_utils import normalize_photos
+from utils.registered_faces import FACE_ENCODINGS_COLLECTION
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Upper bounds for an uploaded photo archive: image members and total
+# uncompressed bytes (a zip bomb is rejected before it fills the disk)
+MAX_ARCHIVE_PHOTOS = 10000
+MAX_ARCHIVE_BYTES = 4 * 2 ** 30
+
+# Accepted spellings of each roster column
+ROSTER_COLUMNS = {
+    'roll_no': ('roll_no', 'rollno', 'roll'),
+    'name': ('name',),
+    'branch': ('branch',),
+    'semester': ('semester', 'sem'),
+    'photo': ('photo', 'image', 'filename', 'file'),
+}
+
+
+def read_roster(text):
+    """
+    Rows of a roster CSV as dicts with roll_no, name, branch, semester and
+    photo (file name inside the photo folder/archive). Header names are
+    matched case-insensitively against ROSTER_COLUMNS.
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    header = {h.strip().lower().replace(' ', '_'): h for h in reader.fieldnames or []}
+    columns = {field: next((header[a] for a in aliases if a in header), None)
+               for field, aliases in ROSTER_COLUMNS.items()}
+    missing = [field for field, column in columns.items() if column is None and field != 'photo']
+    if missing:
+        raise ValueError(f"Roster is missing columns: {', '.join(missing)}")
+    return [{field: (row.get(column) or '').strip() if column else '' for field, column in columns.items()}
+            for row in reader]
+
+
+def index_photos(directory):
+    """
+    {lower-case file name: path} for the images in directory (recursively).
+    Raises ValueError when two images share a name, since a roster row
+    could not tell them apart.
+    """
+    photos = {}
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(root, filename)
+                if filename.lower() in photos:
+                    raise ValueError(f"Duplicate photo name {filename}: {photos[filename.lower()]} and {path}")
+                photos[filename.lower()] = path
+    return photos
+
+
+def extract_photos(archive, target_dir, max_photos=MAX_ARCHIVE_PHOTOS, max_bytes=MAX_ARCHIVE_BYTES):
+    """
+    Extract the images of a zip archive (path or file object) into target_dir,
+    flattened to their base names so no member can escape the directory.
+    Raises ValueError for more than max_photos images, more than max_bytes
+    uncompressed, or two images with the same base name in different folders.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        members, seen = [], {}
+        for member in zf.infolist():
+            filename = os.path.basename(member.filename)
+            if member.is_dir() or not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            if filename.lower() in seen:
+                raise ValueError(f"Duplicate photo name {filename}: {seen[filename.lower()]} and {member.filename}")
+            seen[filename.lower()] = member.filename
+            members.append((member, filename))
+        if len(members) > max_photos:
+            raise ValueError(f"Archive has {len(members)} photos; the limit is {max_photos}")
+        # zipfile never yields more than a member's declared file_size
+        if sum(member.file_size for member, _ in members) > max_bytes:
+            raise ValueError(f"Archive expands to more than {max_bytes // 2 ** 20} MB")
+
+        for member, filename in members:
+            with zf.open(member) as src, open(os.path.join(target_dir, filename), 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+    return target_dir
+
+
+def _photo_for(row, photos):
+    if row['photo']:
+        return photos.get(os.path.basename(row['photo']).lower())
+    # No photo column: look for <roll_no>.<ext>
+    return next((photos[f"{row['roll_no']}{ext}".lower()] for ext in IMAGE_EXTENSIONS
+                 if f"{row['roll_no']}{ext}".lower() in photos), None)
+
+
+def _undo_students(db, inserted, failed, order, report):
+    """
+    Delete the students (and any encoding) whose encoding insert failed, so
+    no student is left that attendance sessions could never recognise.
+    Removes them from inserted and marks their rows failed.
+    """
+    ids = [inserted[k] for k in failed]
+    try:
+        db[FACE_ENCODINGS_COLLECTION].delete_many({'student_id': {'$in': ids}})
+        db['students'].delete_many({'_id': {'$in': ids}})
+        undone = 'not enrolled'
+    except Exception as e:
+        undone = f"student left without an encoding ({e}); run 'flask backfill-encodings'"
+    for k, message in failed.items():
+        report[order[k]].update(status='failed', error=f'Could not store face encoding: {message}; {undone}')
+        del inserted[k]
+
+
+def enroll_students(db, face_images, rows, photos, workers=1):
+    """
+    Register many students at once.
+      1. validate rows and find their photos
+      2. one $in query for students that already exist, plus in-file duplicates
+      3. normalize and encode the remaining photos across `workers` processes
+      4. insert_many the students, then their encodings; a student whose
+         encoding cannot be stored is deleted again and reported failed
+    Returns (report, enrolled) where report has one entry per roster row
+    (status enrolled, duplicate, invalid, rejected or failed) in roster
+    order and enrolled holds the inserted student documents.
+    """
+    report = [{'row': i + 1, 'roll_no': row.get('roll_no', '')} for i, row in enumerate(rows)]
+    candidates = []  # (row index, semester, photo path)
+    for i, row in enumerate(rows):
+        if not all(row.get(f) for f in ('roll_no', 'name', 'branch', 'semester')):
+            report[i].update(status='invalid', error='Missing roll_no, name, branch or semester')
+            continue
+        try:
+            semester = int(row['semester'])
+        except ValueError:
+            report[i].update(status='invalid', error='Semester must be a number')
+            continue
+        path = _photo_for(row, photos)
+        if path is None:
+            report[i].update(status='invalid', error='Photo not found')
+            continue
+        candidates.append((i, semester, path))
+
+    # Same uniqueness rule as /register and the roll_no_branch_semester index
+    existing = {
+        (s['roll_no'], s['branch'], s['semester'])
+        for s in db['students'].find({'roll_no': {'$in': sorted({rows[i]['roll_no'] for i, _, _ in candidates})}},
+                                     {'_id': 0, 'roll_no': 1, 'branch': 1, 'semester': 1})
+    }
+    unique = []
+    for i, semester, path in candidates:
+        key = (rows[i]['roll_no'], rows[i]['branch'], semester)
+        if key in existing:
+            report[i].update(status='duplicate', error='Student already exists')
+            continue
+        existing.add(key)
+        unique.append((i, semester, path))
+
+    normalized = normalize_photos([path for _, _, path in unique], workers=workers)
+
+    students, encodings, order = [], [], []
+    for (i, semester, path), (result, error) in zip(unique, normalized):
+        if result is None:
+            report[i].update(status='rejected', error=error or 'No face detected in the image')
+            continue
+        encoding, jpeg, thumb = result
+        try:
+            face_image, face_thumbnail = face_images.put(jpeg), face_images.put(thumb)
+        except OSError as e:
+            report[i].update(status='failed', error=str(e))
+            continue
+        row = rows[i]
+        students.append({
+            'roll_no': row['roll_no'],
+            'name': row['name'],
+            'branch': row['branch'],
+            'semester': semester,
+            'face_image': face_image,
+            'face_thumbnail': face_thumbnail,
+            'created_at': datetime.datetime.now()
+        })
+        encodings.append(encoding)
+        order.append(i)
+
+    inserted = {}
+    if students:
+        try:
+            result = db['students'].insert_many(students, ordered=False)
+            inserted = dict(enumerate(result.inserted_ids))
+        except BulkWriteError as e:
+            # Unordered: the rows without a write error were inserted, and
+            # insert_many set their _id on the documents
+            failed = {err['index']: err.get('errmsg', 'write error') for err in e.details.get('writeErrors', [])}
+            inserted = {k: doc['_id'] for k, doc in enumerate(students) if k not in failed}
+            for k, message in failed.items():
+                report[order[k]].update(status='failed', error=message)
+
+    if inserted:
+        keys = list(inserted)
+        failed = {}
+        try:
+            db[FACE_ENCODINGS_COLLECTION].insert_many([
+                {'student_id': inserted[k], 'encoding': np.asarray(encodings[k], dtype='<f8').tobytes()}
+                for k in keys
+            ], ordered=False)
+        except BulkWriteError as e:
+            failed = {keys[err['index']]: err.get('errmsg', 'write error')
+                      for err in e.details.get('writeErrors', [])}
+        except Exception as e:
+            # Unknown outcome: treat every encoding as missing
+            failed = {k: str(e) for k in keys}
+        if failed:
+            _undo_students(db, inserted, failed, order, report)
+    for k, student_id in inserted.items():
+        report[order[k]].update(status='enrolled', student_id=str(student_id))
+    return report, [students[k] for k in inserted]
@@ -0,0 +1,137 @@
+import queue
+import threading
+from collections import deque
+
+# Drop policies for the frame ring buffer
+DROP_STALE = "latest"  # workers take the newest frame, everything older is dropped
+DROP_OLDEST = "fifo"   # frames are processed in order, the oldest is dropped on overflow
+
+
+class CapturePipeline:
+    """
+    Threaded capture -> recognition pipeline.
+    A capture thread reads from a cv2.VideoCapture into a bounded ring
+    buffer so the camera is drained continuously and OpenCV's own buffer
+    never fills with stale frames. A pool of workers runs process_fn on
+    frames from the buffer and publishes results for the caller.
+    Stateful process_fn (e.g. FaceTracker.update) must use workers=1.
+    If process_fn raises, the pipeline stops and the first exception is
+    re-raised from results() and stop().
+    """
+
+    def __init__(self, cap, process_fn, workers=1, queue_depth=2, drop_policy=DROP_STALE):
+        if drop_policy not in (DROP_STALE, DROP_OLDEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.cap = cap
+        self.process_fn = process_fn
+        self.workers = max(1, workers)
+        self.drop_policy = drop_policy
+        self.buffer = deque(maxlen=max(1, queue_depth))
+        self.results_queue = queue.Queue(maxsize=max(1, queue_depth) * self.workers)
+        self.stats = {"captured": 0, "processed": 0, "dropped": 0}
+        self.error = None  # first exception raised by process_fn
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._capture_done = False
+        self._active_workers = 0
+        self._threads = []
+
+    def start(self):
+        self._threads = [threading.Thread(target=self._capture_loop, name="capture", daemon=True)]
+        self._active_workers = self.workers
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(target=self._worker_loop, name=f"recognition-{i}", daemon=True))
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._raise_error()
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def results(self, timeout=0.1, should_stop=None):
+        """
+        Yield process_fn results until capture ends, stop() is called or
+        the optional should_stop() callback returns True.
+        """
+        while True:
+            self._raise_error()
+            if should_stop and should_stop():
+                return
+            try:
+                yield self.results_queue.get(timeout=timeout)
+            except queue.Empty:
+                with self._cond:
+                    finished = self._active_workers == 0
+                if finished or self._stop.is_set():
+                    self._raise_error()
+                    # Drain anything published between the check and now
+                    while not self.results_queue.empty():
+                        yield self.results_queue.get_nowait()
+                    return
+
+    def _capture_loop(self):
+        try:
+            while not self._stop.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                with self._cond:
+                    self.stats["captured"] += 1
+                    if len(self.buffer) == self.buffer.maxlen:
+                        self.stats["dropped"] += 1
+                    self.buffer.append(frame)
+                    self._cond.notify()
+        finally:
+            with self._cond:
+                self._capture_done = True
+                self._cond.notify_all()
+
+    def _next_frame(self):
+        with self._cond:
+            while not self.buffer:
+                if self._capture_done or self._stop.is_set():
+                    return None
+                self._cond.wait(timeout=0.5)
+            if self.drop_policy == DROP_STALE:
+                frame = self.buffer.pop()
+                self.stats["dropped"] += len(self.buffer)
+                self.buffer.clear()
+            else:
+                frame = self.buffer.popleft()
+            return frame
+
+    def _worker_loop(self):
+        try:
+            while not self._stop.is_set():
+                frame = self._next_frame()
+                if frame is None:
+                    break
+                result = self.process_fn(frame)
+                with self._cond:
+                    self.stats["processed"] += 1
+                while not self._stop.is_set():
+                    try:
+                        self.results_queue.put(result, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            # Keep the first failure and stop the other threads with it
+            with self._cond:
+                if self.error is None:
+                    self.error = e
+                self._stop.set()
+                self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._active_workers -= 1
@@ -0,0 +1,117 @@
+import os
+import threading
+
+from pymongo import MongoClient, ReadPreference
+
+# Read preferences accepted in MONGO_READ_PREFERENCE
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+_client = None
+_client_pid = None
+_db_name = None
+_lock = threading.Lock()
+_default_uri = None
+
+
+def load_config(environ=None):
+    """MongoDB client settings, read from the environment."""
+    env = os.environ if environ is None else environ
+    return {
+        "uri": env.get("MONGODB_URI") or _default_uri,
+        "db_name": env.get("MONGODB_DB", "attendance_db"),
+        "maxPoolSize": int(env.get("MONGO_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(env.get("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(env.get("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "serverSelectionTimeoutMS": int(env.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(env.get("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(env.get("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+        "read_preference": env.get("MONGO_READ_PREFERENCE", "primary"),
+    }
+
+
+def configure(default_uri):
+    """Set the URI used when MONGODB_URI is not in the environment."""
+    global _default_uri
+    _default_uri = default_uri
+
+
+def get_client():
+    """
+    The application-wide MongoClient for this process.
+    Created lazily on first use, so under gunicorn each worker builds its
+    own pool after fork instead of inheriting the master's sockets.
+    """
+    global _client, _client_pid, _db_name
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            config = load_config()
+            if not config["uri"]:
+                raise RuntimeError("MONGODB_URI is not configured")
+            _client = MongoClient(
+                config["uri"],
+                maxPoolSize=config["maxPoolSize"],
+                minPoolSize=config["minPoolSize"],
+                maxIdleTimeMS=config["maxIdleTimeMS"],
+                serverSelectionTimeoutMS=config["serverSelectionTimeoutMS"],
+                connectTimeoutMS=config["connectTimeoutMS"],
+                socketTimeoutMS=config["socketTimeoutMS"],
+                read_preference=READ_PREFERENCES[config["read_preference"]],
+                connect=False,
+            )
+            _client_pid = pid
+            _db_name = config["db_name"]
+    return _client
+
+
+def get_db():
+    client = get_client()
+    return client[_db_name]
+
+
+def close_client():
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def _forget_client_after_fork():
+    # The child must not use (or close) the parent's sockets
+    global _client, _client_pid
+    _client = None
+    _client_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+
+class LazyDatabase:
+    """Module-level stand-in for a Database that resolves the shared client on use."""
+
+    def __getitem__(self, name):
+        return LazyCollection(name)
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+
+class LazyCollection:
+    """Module-level stand-in for a Collection that resolves the shared client on use."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self.name], attr)
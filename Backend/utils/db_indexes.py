@@ -0,0 +1,171 @@
+import logging
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes required by the queries in app.py: collection -> [(keys, options)]
+REQUIRED_INDEXES = {
+    "attendance": [
+        # start_attendance: already taken today for this subject?
+        ([("subject_code", ASCENDING), ("date", ASCENDING), ("semester", ASCENDING), ("branch", ASCENDING)],
+         {"name": "subject_date_semester_branch"}),
+        # One mark per student, subject and day (capture upsert, manual marks).
+        # Partial on roll: ensure_indexes first copies roll_no into roll on
+        # older records, so they are covered too
+        ([("roll", ASCENDING), ("subject_code", ASCENDING), ("date", ASCENDING)],
+         {"name": "roll_subject_date_unique", "unique": True,
+          "partialFilterExpression": {"roll": {"$exists": True}}}),
+        # /mark/getrange and reports: semester equality, then date range
+        ([("semester", ASCENDING), ("date", ASCENDING)],
+         {"name": "semester_date"}),
+        ([("semester", ASCENDING), ("branch", ASCENDING), ("date", ASCENDING)],
+         {"name": "semester_branch_date"}),
+        ([("semester", ASCENDING), ("subject_code", ASCENDING), ("date", ASCENDING)],
+         {"name": "semester_subject_date"}),
+        # /mark/get by day
+        ([("date", ASCENDING), ("semester", ASCENDING)],
+         {"name": "date_semester"}),
+        # Older records written by /attendance/mark use roll_no
+        ([("roll_no", ASCENDING), ("subject_code", ASCENDING), ("date", ASCENDING)],
+         {"name": "roll_no_subject_date"}),
+    ],
+    "students": [
+        ([("roll_no", ASCENDING), ("branch", ASCENDING), ("semester", ASCENDING)],
+         {"name": "roll_no_branch_semester_unique", "unique": True}),
+        ([("semester", ASCENDING), ("branch", ASCENDING)],
+         {"name": "semester_branch"}),
+        ([("roll", ASCENDING)],
+         {"name": "roll", "sparse": True}),
+    ],
+    "attendance_rollups": [
+        ([("semester", ASCENDING), ("branch", ASCENDING), ("subject_code", ASCENDING), ("roll", ASCENDING)],
+         {"name": "semester_branch_subject_roll_unique", "unique": True}),
+        # /api/student attendance totals
+        ([("roll", ASCENDING), ("semester", ASCENDING)],
+         {"name": "roll_semester"}),
+    ],
+    "class_rollups": [
+        ([("semester", ASCENDING), ("branch", ASCENDING), ("subject_code", ASCENDING)],
+         {"name": "semester_branch_subject_unique", "unique": True}),
+    ],
+    "face_encodings": [
+        ([("student_id", ASCENDING)],
+         {"name": "student_id_unique", "unique": True}),
+    ],
+    "subjects": [
+        ([("code", ASCENDING)],
+         {"name": "code_unique", "unique": True}),
+        ([("semester", ASCENDING), ("branch", ASCENDING), ("code", ASCENDING)],
+         {"name": "semester_branch_code"}),
+    ],
+}
+
+# Representative filters of the hot queries, checked with explain()
+HOT_QUERIES = [
+    ("start_attendance: taken today", "attendance",
+     {"subject_code": "X", "date": "2000-01-01", "semester": 1, "branch": "X"}),
+    ("capture upsert", "attendance",
+     {"roll": "X", "subject_code": "X", "date": "2000-01-01"}),
+    ("/mark/get", "attendance",
+     {"date": "2000-01-01", "semester": 1}),
+    ("/mark/getrange", "attendance",
+     {"date": {"$gte": "2000-01-01", "$lte": "2000-12-31"}, "semester": 1}),
+    ("generate_filtered_report", "attendance",
+     {"semester": 1, "branch": "X", "date": {"$gte": "2000-01-01", "$lte": "2000-12-31"}}),
+    ("generate_filtered_report (subject)", "attendance",
+     {"semester": 1, "subject_code": "X", "date": {"$gte": "2000-01-01", "$lte": "2000-12-31"}}),
+    ("summary report (rollups)", "attendance_rollups",
+     {"semester": 1, "branch": "X"}),
+    ("student attendance (rollups)", "attendance_rollups",
+     {"roll": "X", "semester": 1}),
+    ("classes held (rollups)", "class_rollups",
+     {"semester": 1, "branch": "X"}),
+    ("register: duplicate check", "students",
+     {"roll_no": "X", "branch": "X", "semester": 1}),
+    ("absentees / promote", "students",
+     {"semester": 1, "branch": "X"}),
+    ("subject lookup", "subjects",
+     {"code": "X", "semester": 1, "branch": "X"}),
+    ("subjects by semester", "subjects",
+     {"semester": 1}),
+]
+
+
+# Attendance records written before roll became the standard field
+LEGACY_ROLL_FILTER = {"roll": {"$exists": False}, "roll_no": {"$exists": True}}
+
+
+def migrate_legacy_rolls(db):
+    """
+    Set roll (trimmed, as a string) on attendance records that only have
+    roll_no, so the unique (roll, subject_code, date) index covers them.
+    roll_no is kept for older readers. Returns the number of records updated.
+    """
+    result = db["attendance"].update_many(
+        LEGACY_ROLL_FILTER,
+        [{"$set": {"roll": {"$trim": {"input": {"$toString": "$roll_no"}}}}}]
+    )
+    if result.modified_count:
+        logger.info(f"Set roll on {result.modified_count} attendance records that only had roll_no")
+    return result.modified_count
+
+
+def legacy_roll_count(db):
+    """Attendance records still outside the unique roll index (see migrate_legacy_rolls)."""
+    return db["attendance"].count_documents(LEGACY_ROLL_FILTER)
+
+
+def ensure_indexes(db):
+    """
+    Create every index in REQUIRED_INDEXES. Safe to run repeatedly: existing
+    indexes with the same spec are left alone. Legacy roll_no-only attendance
+    records are migrated first (migrate_legacy_rolls). Returns
+    {collection: [results]} where each result is the index name or an error
+    string.
+    """
+    migrate_legacy_rolls(db)
+    report = {}
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        results = []
+        for keys, options in indexes:
+            try:
+                results.append(collection.create_index(keys, **options))
+            except OperationFailure as e:
+                # e.g. duplicates already in the data for a unique index
+                logger.error(f"❌ Could not create index {options['name']} on {collection_name}: {e}")
+                results.append(f"error: {options['name']}: {e}")
+        report[collection_name] = results
+    return report
+
+
+def _plan_stages(plan):
+    """All stage names in an explain() winning plan tree."""
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return [s for s in stages if s]
+
+
+def check_query_coverage(db):
+    """
+    Explain each hot query and report the ones that fall back to a
+    collection scan. Returns a list of {query, collection, stages, covered}.
+    """
+    results = []
+    for label, collection_name, query in HOT_QUERIES:
+        explain = db[collection_name].find(query).explain()
+        winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(winning)
+        results.append({
+            "query": label,
+            "collection": collection_name,
+            "stages": stages,
+            "covered": "COLLSCAN" not in stages,
+        })
+    return results
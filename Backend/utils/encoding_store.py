@@ -0,0 +1,172 @@
+import json
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized across processes
+    fcntl = None
+
+# Store file: data/known_faces/.encoding_store.bin
+STORE_FILENAME = ".encoding_store.bin"
+ENCODING_DIM = 128
+
+# Layout: MAGIC | uint32 header length | JSON header | padding | float32 N x 128
+MAGIC = b"FACESTR1"
+_ALIGN = 64
+
+
+def _group_key(semester, branch):
+    return f"{int(semester)}|{str(branch).strip().upper()}"
+
+
+def write_store(path, entries):
+    """
+    Write a new store file from (encoding, meta) pairs and rename it over
+    path. meta holds roll, semester, branch and name (the gallery label).
+    Rows are sorted by (semester, branch, name) so every class is one
+    contiguous row range, recorded in the header.
+    Readers that already mapped the old file keep using it until they refresh.
+    """
+    entries = sorted(entries, key=lambda e: (int(e[1]["semester"]), str(e[1]["branch"]).upper(), e[1]["name"]))
+    matrix = np.asarray([e[0] for e in entries], dtype=np.float32).reshape(-1, ENCODING_DIM)
+
+    groups = {}
+    for row, (_, meta) in enumerate(entries):
+        start, _ = groups.get(_group_key(meta["semester"], meta["branch"]), (row, row))
+        groups[_group_key(meta["semester"], meta["branch"])] = (start, row + 1)
+    header = json.dumps({
+        "rows": len(entries),
+        "dim": ENCODING_DIM,
+        "meta": [[m["roll"], int(m["semester"]), m["branch"], m["name"]] for _, m in entries],
+        "groups": groups,
+    }).encode("utf-8")
+    offset = len(MAGIC) + 4 + len(header)
+    offset += -offset % _ALIGN
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".encoding_store_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(matrix.astype("<f4").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return len(entries)
+
+
+class EncodingStore:
+    """
+    Read-only, memory-mapped view of the store file. Every process that maps
+    it shares the same pages, and select() returns row slices of the map, so
+    a class gallery is never copied. refresh() remaps after a writer replaced
+    the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.matrix = np.zeros((0, ENCODING_DIM), dtype=np.float32)
+        self.meta = []
+        self.groups = {}
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def refresh(self):
+        """Map the current file if it changed since the last call. Returns True if remapped."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if stat == self._stat:
+                return False
+            with open(self.path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"Not an encoding store: {self.path}")
+                (header_len,) = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(header_len))
+            offset = len(MAGIC) + 4 + header_len
+            offset += -offset % _ALIGN
+            rows = header["rows"]
+            if rows:
+                self.matrix = np.memmap(self.path, dtype="<f4", mode="r", offset=offset,
+                                        shape=(rows, header["dim"]))
+            else:
+                self.matrix = np.zeros((0, ENCODING_DIM), dtype=np.float32)
+            self.meta = header["meta"]
+            self.groups = {key: tuple(span) for key, span in header["groups"].items()}
+            self._stat = stat
+            return True
+
+    def select(self, semester, branch, rolls=None):
+        """
+        (encodings, names, missing) of one class. encodings is a zero-copy
+        row range of the map; missing lists the given rolls (the class roster)
+        that have no row, i.e. students the session will not recognise.
+        """
+        with self._lock:
+            start, end = self.groups.get(_group_key(semester, branch), (0, 0))
+            meta = self.meta[start:end]
+            missing = sorted({str(r) for r in rolls} - {m[0] for m in meta}) if rolls is not None else []
+            return self.matrix[start:end], [m[3] for m in meta], missing
+
+    def __len__(self):
+        return len(self.meta)
+
+    def snapshot(self):
+        """Size of the mapped store, for /status."""
+        with self._lock:
+            return {"rows": len(self.meta), "classes": len(self.groups), "mapped": self._stat is not None}
+
+
+@contextmanager
+def _store_lock(path):
+    # Writers from several workers are serialized with a lock file, so the
+    # last rename always reflects the latest data
+    with open(path + ".lock", "a") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def rebuild_store(path, load_entries):
+    """
+    Rebuild the store from load_entries() (a callable returning (encoding, meta)
+    pairs, read while holding the lock).
+    """
+    with _store_lock(path):
+        return write_store(path, load_entries())
+
+
+def rebuild_classes(path, classes, load_entries):
+    """
+    Replace the rows of the given (semester, branch) classes with
+    load_entries() and keep every other row of the current file, so a
+    registration re-reads one class from MongoDB instead of the campus.
+    With no store file yet, only the given classes are written.
+    """
+    keys = {_group_key(semester, branch) for semester, branch in classes}
+    with _store_lock(path):
+        current = EncodingStore(path)
+        current.refresh()
+        kept = [(current.matrix[row], {"roll": m[0], "semester": m[1], "branch": m[2], "name": m[3]})
+                for row, m in enumerate(current.meta) if _group_key(m[1], m[2]) not in keys]
+        return write_store(path, kept + list(load_entries()))
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+
+# Objects live under <root>/objects/<first two hex digits>/<sha256><ext>
+OBJECTS_DIR = "objects"
+
+
+class FaceImageStore:
+    """
+    Content-addressed store for registration photos. An image is saved once
+    under its SHA-256 and never renamed. The student document holds the
+    object name (face_image); semester and branch stay in the students
+    collection and its indexes, so promotion never touches the files.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, OBJECTS_DIR)
+
+    def path(self, name):
+        return os.path.join(self.objects_dir, name[:2], name)
+
+    def exists(self, name):
+        return bool(name) and os.path.exists(self.path(name))
+
+    def put(self, data, ext=".jpg"):
+        """Store encoded image bytes and return the object name. Identical images are stored once."""
+        name = hashlib.sha256(data).hexdigest() + ext
+        path = self.path(name)
+        if os.path.exists(path):
+            return name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return name
+
+    def put_file(self, file_path):
+        with open(file_path, "rb") as f:
+            return self.put(f.read(), os.path.splitext(file_path)[1].lower() or ".jpg")
+
+    def names(self):
+        """Every object name currently stored."""
+        if not os.path.isdir(self.objects_dir):
+            return
+        for prefix in sorted(os.listdir(self.objects_dir)):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in sorted(os.listdir(prefix_dir)):
+                if not name.endswith(".tmp"):
+                    yield name
+
+    def prune(self, live_names):
+        """Delete objects no student references any more. Returns the number removed."""
+        live = set(live_names)
+        removed = 0
+        for name in list(self.names()):
+            if name not in live:
+                os.remove(self.path(name))
+                removed += 1
+        return removed
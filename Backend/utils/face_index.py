@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class BruteForceIndex:
+    """Exact nearest-neighbour search over the whole gallery (the default)."""
+
+    def __init__(self, known_face_encodings):
+        self.data = np.ascontiguousarray(np.asarray(known_face_encodings, dtype=np.float32).reshape(-1, 128))
+        self.sq_norms = np.einsum("ij,ij->i", self.data, self.data)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def search(self, queries, k=1):
+        """
+        Return (indices, distances), each shaped (n_queries, k) and sorted by
+        distance. Missing slots (gallery smaller than k) are -1 / inf.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, 128)
+        n_queries = queries.shape[0]
+        indices = np.full((n_queries, k), -1, dtype=np.int64)
+        distances = np.full((n_queries, k), np.inf, dtype=np.float32)
+        if n_queries == 0 or len(self) == 0:
+            return indices, distances
+
+        d = _pairwise_distances(queries, self.data, self.sq_norms)
+        kk = min(k, d.shape[1])
+        top = np.argpartition(d, kk - 1, axis=1)[:, :kk]
+        top_d = np.take_along_axis(d, top, axis=1)
+        order = np.argsort(top_d, axis=1, kind="stable")
+        indices[:, :kk] = np.take_along_axis(top, order, axis=1)
+        distances[:, :kk] = np.take_along_axis(top_d, order, axis=1)
+        return indices, distances
+
+
+class IVFIndex:
+    """
+    Approximate search with an inverted file: the gallery is clustered with
+    k-means into n_lists coarse cells and each query only scans the n_probe
+    closest cells. Raise n_probe for recall, lower it for latency.
+    """
+
+    def __init__(self, known_face_encodings, n_lists=None, n_probe=8, n_iter=10, seed=0):
+        data = np.ascontiguousarray(np.asarray(known_face_encodings, dtype=np.float32).reshape(-1, 128))
+        n = data.shape[0]
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n)) or 1))
+        self.n_probe = n_probe
+
+        self.centroids = _kmeans(data, self.n_lists, n_iter, seed) if n else np.zeros((0, 128), np.float32)
+        assign = (_pairwise_distances(data, self.centroids).argmin(axis=1)
+                  if n else np.zeros(0, dtype=np.int64))
+
+        # Store the gallery grouped by cell so each probe is a contiguous slice
+        self.ids = np.argsort(assign, kind="stable")
+        self.data = data[self.ids]
+        self.sq_norms = np.einsum("ij,ij->i", self.data, self.data)
+        counts = np.bincount(assign, minlength=self.n_lists)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def search(self, queries, k=1, n_probe=None):
+        """Same contract as BruteForceIndex.search, scanning n_probe cells per query."""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, 128)
+        n_queries = queries.shape[0]
+        indices = np.full((n_queries, k), -1, dtype=np.int64)
+        distances = np.full((n_queries, k), np.inf, dtype=np.float32)
+        if n_queries == 0 or len(self) == 0:
+            return indices, distances
+
+        cell_d = _pairwise_distances(queries, self.centroids)
+        probes = np.argsort(cell_d, axis=1)[:, :n_probe]
+
+        for qi in range(n_queries):
+            rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes[qi]])
+            if rows.size == 0:
+                continue
+            d = _pairwise_distances(queries[qi:qi + 1], self.data[rows], self.sq_norms[rows])[0]
+            kk = min(k, d.size)
+            top = np.argpartition(d, kk - 1)[:kk]
+            top = top[np.argsort(d[top], kind="stable")]
+            indices[qi, :kk] = self.ids[rows[top]]
+            distances[qi, :kk] = d[top]
+        return indices, distances
+
+
+def build_index(known_face_encodings, kind="exact", **options):
+    """Build a search index over a class gallery (e.g. EncodingStore.select)."""
+    if kind == "exact":
+        return BruteForceIndex(known_face_encodings)
+    if kind == "ivf":
+        return IVFIndex(known_face_encodings, **options)
+    raise ValueError(f"Unknown face index type: {kind}")
+
+
+def recall_at_k(index, exact_index, queries, k=1):
+    """Fraction of the exact top-k neighbours that the index also returns."""
+    approx_ids, _ = index.search(queries, k)
+    exact_ids, _ = exact_index.search(queries, k)
+    hits = sum(len(set(a) & set(e) - {-1}) for a, e in zip(approx_ids, exact_ids))
+    total = sum(len(set(e) - {-1}) for e in exact_ids)
+    return hits / total if total else 1.0
+
+
+def _pairwise_distances(queries, data, data_sq_norms=None):
+    if data_sq_norms is None:
+        data_sq_norms = np.einsum("ij,ij->i", data, data)
+    q_sq = np.einsum("ij,ij->i", queries, queries)
+    d2 = q_sq[:, None] + data_sq_norms[None, :] - 2.0 * (queries @ data.T)
+    np.maximum(d2, 0.0, out=d2)
+    return np.sqrt(d2, out=d2)
+
+
+def _kmeans(data, n_clusters, n_iter, seed):
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(data.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = _pairwise_distances(data, centroids).argmin(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=n_clusters)
+        nonempty = counts > 0
+        centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+    return centroids
@@ -0,0 +1,82 @@
+import numpy as np
+
+UNKNOWN = "Unknown"
+
+
+class FaceMatcher:
+    """
+    Vectorized matching engine over a gallery of known face encodings.
+    The gallery is kept as one contiguous float32 matrix with precomputed
+    squared norms, so every face in a frame is scored against the whole
+    gallery with a single matrix product.
+    """
+
+    def __init__(self, known_face_encodings, known_face_names, tolerance=0.5, index=None):
+        self.names = list(known_face_names)
+        self.tolerance = tolerance
+        # Optional approximate index (see utils.face_index); None means exact
+        self.index = index
+        if len(known_face_encodings):
+            self.gallery = np.ascontiguousarray(np.asarray(known_face_encodings, dtype=np.float32))
+        else:
+            self.gallery = np.zeros((0, 128), dtype=np.float32)
+        self.gallery_sq_norms = np.einsum("ij,ij->i", self.gallery, self.gallery)
+        # Exact copy used to confirm the few candidates the float32 pass picks.
+        # A float32 matrix (e.g. rows of the memory-mapped EncodingStore) is
+        # used as is, so a shared gallery is not copied per session.
+        if isinstance(known_face_encodings, np.ndarray) and known_face_encodings.dtype == np.float32:
+            self._gallery64 = self.gallery
+        else:
+            self._gallery64 = np.asarray(known_face_encodings, dtype=np.float64).reshape(-1, 128)
+
+    def __len__(self):
+        return len(self.names)
+
+    def distances(self, face_encodings):
+        """Euclidean distance matrix (faces x gallery) in float32."""
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, self.gallery.shape[1])
+        q_sq = np.einsum("ij,ij->i", queries, queries)
+        d2 = q_sq[:, None] + self.gallery_sq_norms[None, :] - 2.0 * (queries @ self.gallery.T)
+        np.maximum(d2, 0.0, out=d2)
+        return np.sqrt(d2, out=d2)
+
+    def match(self, face_encodings):
+        """
+        Score all faces against the gallery.
+        Returns (best_index, best_distance, margin) arrays, one entry per face.
+        best_index is -1 when the closest face is not under tolerance; margin
+        is the gap to the second-closest gallery face (inf if there is none).
+        """
+        n_faces = len(face_encodings)
+        best_index = np.full(n_faces, -1, dtype=np.int64)
+        best_distance = np.full(n_faces, np.inf)
+        margin = np.full(n_faces, np.inf)
+        if n_faces == 0 or len(self) == 0:
+            return best_index, best_distance, margin
+
+        if self.index is not None:
+            candidates, _ = self.index.search(face_encodings, k=2)
+        else:
+            d = self.distances(face_encodings)
+            k = min(2, d.shape[1])
+            candidates = np.argpartition(d, k - 1, axis=1)[:, :k]
+
+        # Re-score the top candidates in float64 so the tolerance test
+        # agrees with face_recognition.face_distance
+        queries = np.asarray(face_encodings, dtype=np.float64).reshape(n_faces, -1)
+        exact = np.linalg.norm(self._gallery64[candidates] - queries[:, None, :], axis=2)
+        for i in range(n_faces):
+            pair = sorted((dist, idx) for dist, idx in zip(exact[i], candidates[i]) if idx >= 0)
+            if not pair:
+                continue
+            best_distance[i] = pair[0][0]
+            if pair[0][0] < self.tolerance:
+                best_index[i] = pair[0][1]
+            if len(pair) > 1:
+                margin[i] = pair[1][0] - pair[0][0]
+        return best_index, best_distance, margin
+
+    def match_names(self, face_encodings):
+        """Names for each face, using the same tolerance rule as process_frame."""
+        best_index, _, _ = self.match(face_encodings)
+        return [self.names[i] if i >= 0 else UNKNOWN for i in best_index]
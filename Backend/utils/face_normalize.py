@@ -0,0 +1,49 @@
+import cv2
+
+# Registration photos are cropped to the face plus this fraction of the face
+# size on every side, then scaled so the longest side is at most MAX_SIDE
+FACE_MARGIN = 0.5
+MAX_SIDE = 480
+JPEG_QUALITY = 90
+# Small preview served to the frontend
+THUMBNAIL_SIDE = 128
+THUMBNAIL_QUALITY = 80
+
+
+def _fit(image, max_side):
+    """Downscale so the longest side is at most max_side; returns (image, factor)."""
+    longest = max(image.shape[:2])
+    if longest <= max_side:
+        return image, 1.0
+    factor = max_side / longest
+    return cv2.resize(image, (0, 0), fx=factor, fy=factor, interpolation=cv2.INTER_AREA), factor
+
+
+def crop_to_face(image, location, margin=FACE_MARGIN, max_side=MAX_SIDE):
+    """
+    Crop image to the (top, right, bottom, left) face box grown by margin,
+    clamped to the image, and bound its longest side.
+    Returns (normalized image, face box in the normalized image).
+    """
+    top, right, bottom, left = location
+    pad = int(margin * max(bottom - top, right - left))
+    height, width = image.shape[:2]
+    y0, y1 = max(0, top - pad), min(height, bottom + pad)
+    x0, x1 = max(0, left - pad), min(width, right + pad)
+
+    crop, factor = _fit(image[y0:y1, x0:x1], max_side)
+    box = (int((top - y0) * factor), int((right - x0) * factor),
+           int((bottom - y0) * factor), int((left - x0) * factor))
+    return crop, box
+
+
+def to_jpeg(image, quality=JPEG_QUALITY):
+    success, data = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not success:
+        raise ValueError("Could not encode image as JPEG")
+    return data.tobytes()
+
+
+def thumbnail(image, side=THUMBNAIL_SIDE, quality=THUMBNAIL_QUALITY):
+    """JPEG bytes of image scaled down to side on its longest edge."""
+    return to_jpeg(_fit(image, side)[0], quality)
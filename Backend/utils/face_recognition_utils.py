@@ -1,104 +1,161 @@
 import face_recognition
 import cv2
-import numpy as np
-import os
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.face_matcher import FaceMatcher
+from utils.face_normalize import crop_to_face, thumbnail, to_jpeg
+from utils.recognition_profile import DEFAULT_PROFILE
 
 # Track last detected face count (to avoid spamming)
 last_face_count = -1
+_face_count_lock = threading.Lock()
 
+# Longest side photos are downscaled to before looking for the face
+MAX_DETECT_SIDE = 1024
 
-def load_known_faces(known_faces_dir, semester=None, branch=None):
-    """
-    Load known faces from directory.
-    Filters by semester and branch if provided.
-    Filename format: roll_sem_name_branch.jpg
-    """
-    known_face_encodings = []
-    known_face_names = []
 
-    if not os.path.exists(known_faces_dir):
-        print(f"⚠ Directory {known_faces_dir} does not exist")
-        return [], []
+def _encode_image(image_path):
+    """Return the first face encoding in an image, or None if no face is found."""
+    face_image = face_recognition.load_image_file(image_path)
+    face_encodings = face_recognition.face_encodings(face_image)
+    return face_encodings[0] if face_encodings else None
 
-    for filename in os.listdir(known_faces_dir):
-        if filename.lower().endswith((".jpg", ".jpeg", ".png")):
-            name_part = os.path.splitext(filename)[0]
-            parts = name_part.split('_')
 
-            if len(parts) < 4:
-                print(f"⚠ Skipping invalid filename: {filename}")
-                continue
+def normalize_registration_image(bgr_image):
+    """
+    Normalize a registration photo: find its single face, crop to it with a
+    margin, bound the size (see utils.face_normalize) and encode the face in
+    the normalized image, which is what gets stored.
+    Returns ((encoding, jpeg_bytes, thumbnail_bytes), None), or (None, reason)
+    when the photo has no face or more than one.
+    """
+    # Detect on a bounded copy; multi-megapixel originals only cost time here
+    longest = max(bgr_image.shape[:2])
+    factor = min(1.0, MAX_DETECT_SIDE / longest)
+    small = cv2.resize(bgr_image, (0, 0), fx=factor, fy=factor, interpolation=cv2.INTER_AREA) \
+        if factor < 1 else bgr_image
+    face_locations = face_recognition.face_locations(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    if not face_locations:
+        return None, "No face detected in the image"
+    if len(face_locations) > 1:
+        return None, f"{len(face_locations)} faces detected in the image; exactly one is required"
+
+    location = scale_locations(face_locations, 1 / factor)[0]
+    normalized, box = crop_to_face(bgr_image, location)
+    rgb = cv2.cvtColor(normalized, cv2.COLOR_BGR2RGB)
+    encoding = face_recognition.face_encodings(rgb, [box])[0]
+    return (encoding, to_jpeg(normalized), thumbnail(normalized)), None
+
+
+def _safe_encode_image(image_path):
+    """Process-pool entry point: returns (encoding, error message)."""
+    try:
+        return _encode_image(image_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _safe_normalize_photo(image_path):
+    """Process-pool entry point: normalize_registration_image for an image file."""
+    try:
+        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if image is None:
+            return None, "Unreadable image"
+        return normalize_registration_image(image)
+    except Exception as e:
+        return None, str(e)
+
+
+def _map_images(fn, image_paths, workers):
+    if workers <= 1 or len(image_paths) < 2:
+        return [fn(path) for path in image_paths]
+
+    workers = min(workers, len(image_paths))
+    chunksize = max(1, len(image_paths) // (workers * 4))
+    # Spawned, not forked: callers run inside a server process that already
+    # has pymongo monitor, session and writer threads, and forking a
+    # multi-threaded process can leave a child deadlocked on a held lock
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        return list(executor.map(fn, image_paths, chunksize=chunksize))
+
+
+def encode_images(image_paths, workers=1):
+    """
+    Encode images, in parallel across processes when workers > 1.
+    Returns a list of (encoding, error) in the same order as image_paths.
+    """
+    return _map_images(_safe_encode_image, image_paths, workers)
 
-            roll_no, file_sem, file_name, file_branch = parts
 
-            # Filter by semester and branch
-            if semester and int(file_sem) != int(semester):
-                continue
-            if branch and file_branch.upper() != branch.upper():
-                continue
+def normalize_photos(image_paths, workers=1):
+    """
+    normalize_registration_image for many files, in parallel across processes.
+    Returns a list of ((encoding, jpeg, thumbnail), error) in input order.
+    """
+    return _map_images(_safe_normalize_photo, image_paths, workers)
 
-            image_path = os.path.join(known_faces_dir, filename)
-            try:
-                face_image = face_recognition.load_image_file(image_path)
-                face_encodings = face_recognition.face_encodings(face_image)
 
-                if face_encodings:
-                    known_face_encodings.append(face_encodings[0])
-                    known_face_names.append(name_part)  # keep full format
-                    print(f"✅ Loaded face: {name_part}")
-                else:
-                    print(f"⚠ No face found in {filename}")
+def detect_faces(rgb_small_frame, scale, profile=DEFAULT_PROFILE):
+    """Face boxes in a downscaled RGB frame, dropping faces below profile.min_face_size."""
+    face_locations = face_recognition.face_locations(
+        rgb_small_frame, number_of_times_to_upsample=profile.upsample, model=profile.model
+    )
+    if profile.min_face_size:
+        min_size = profile.min_face_size * scale
+        face_locations = [loc for loc in face_locations if loc[2] - loc[0] >= min_size]
+    return face_locations
 
-            except Exception as e:
-                print(f"❌ Error loading {filename}: {str(e)}")
-                continue
 
-    return known_face_encodings, known_face_names
+def encode_faces(rgb_small_frame, face_locations, profile=DEFAULT_PROFILE):
+    return face_recognition.face_encodings(rgb_small_frame, face_locations, num_jitters=profile.num_jitters)
 
 
-def process_frame(frame, known_face_encodings, known_face_names, tolerance=0.5):
+def process_frame(frame, known_face_encodings, known_face_names, tolerance=0.5, matcher=None,
+                  profile=DEFAULT_PROFILE):
     """
     Process a single frame for face recognition using distance-based matching.
     Supports multiple faces in one frame.
+    Pass a prebuilt FaceMatcher to avoid rebuilding the gallery every frame.
+    The RecognitionProfile controls downscaling, detector and encoder settings.
     """
     global last_face_count
 
-    # Resize frame for faster processing (less aggressive now)
-    small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
+    # Resize frame for faster processing
+    scale = profile.scale
+    small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale) if scale != 1 else frame
     rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
 
     # Detect faces and encodings
-    face_locations = face_recognition.face_locations(rgb_small_frame)
-    face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations)
+    face_locations = detect_faces(rgb_small_frame, scale, profile)
+    face_encodings = encode_faces(rgb_small_frame, face_locations, profile)
 
     # Only print when count changes
-    if len(face_locations) != last_face_count:
-        print(f"📸 Detected {len(face_locations)} faces in this frame")
-        last_face_count = len(face_locations)
-
-    face_names = []
-    for face_encoding in face_encodings:
-        name = "Unknown"
-        if known_face_encodings:
-            distances = face_recognition.face_distance(known_face_encodings, face_encoding)
-
-            # Check all matches under tolerance
-            matches = [i for i, d in enumerate(distances) if d < tolerance]
+    with _face_count_lock:
+        if len(face_locations) != last_face_count:
+            print(f"📸 Detected {len(face_locations)} faces in this frame")
+            last_face_count = len(face_locations)
 
-            if matches:
-                # Pick the closest valid match
-                best_match_index = matches[np.argmin([distances[i] for i in matches])]
-                name = known_face_names[best_match_index]
-
-        face_names.append(name)
+    # Closest gallery face under tolerance, all faces scored in one call
+    if matcher is None:
+        matcher = FaceMatcher(known_face_encodings, known_face_names, tolerance)
+    face_names = matcher.match_names(face_encodings)
 
     # Scale face locations back to original frame size
-    face_locations = [(top * 2, right * 2, bottom * 2, left * 2)
-                      for (top, right, bottom, left) in face_locations]
+    face_locations = scale_locations(face_locations, 1 / scale)
+    profile.observe(face_locations)
 
     return face_locations, face_names
 
 
+def scale_locations(face_locations, factor):
+    """Scale (top, right, bottom, left) boxes by factor."""
+    return [(int(top * factor), int(right * factor), int(bottom * factor), int(left * factor))
+            for (top, right, bottom, left) in face_locations]
+
+
 def draw_face_boxes(frame, face_locations, face_names):
     """
     Draw boxes and names around detected faces.
@@ -0,0 +1,144 @@
+import itertools
+
+import cv2
+import numpy as np
+
+from utils.face_matcher import UNKNOWN
+from utils.face_recognition_utils import detect_faces, encode_faces, scale_locations
+from utils.recognition_profile import DEFAULT_PROFILE
+
+# Minimum overlap for a detection to continue an existing track
+IOU_THRESHOLD = 0.3
+# Optical flow needs at least this many good points inside a box
+MIN_FLOW_POINTS = 4
+
+
+def iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0, bottom - top) * max(0, right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """
+    Detect-every-N-frames face recognition.
+    Full HOG detection runs every detect_every frames (or as soon as a track
+    is lost); in between, boxes are moved with Lucas-Kanade optical flow on
+    the downsized grayscale frame. Detection settings come from the
+    RecognitionProfile, as in process_frame. Tracks keep the identity they were given,
+    so known faces are never re-encoded while they stay tracked.
+    Drop-in replacement for process_frame: update() returns
+    (face_locations, face_names) in original frame coordinates.
+    """
+
+    def __init__(self, matcher, detect_every=5, max_missed=2, profile=DEFAULT_PROFILE):
+        self.matcher = matcher
+        self.profile = profile
+        self.detect_every = max(1, detect_every)
+        self.max_missed = max_missed
+        self.tracks = []  # dicts: id, box (original frame coords), name, missed
+        self.frame_index = 0
+        self.prev_gray = None
+        self.prev_scale = None
+        self.need_detection = True
+        self._ids = itertools.count()
+        self.stats = {"frames": 0, "detections": 0, "encodings": 0}
+
+    def update(self, frame):
+        scale = self.profile.scale
+        small_frame = cv2.resize(frame, (0, 0), fx=scale, fy=scale) if scale != 1 else frame
+        gray = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+
+        # Flow needs both frames at the same size, so a scale change forces detection
+        if (self.need_detection or self.frame_index % self.detect_every == 0
+                or self.prev_gray is None or scale != self.prev_scale):
+            self._detect(cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB), scale)
+        else:
+            self._follow(gray, scale)
+
+        self.prev_gray = gray
+        self.prev_scale = scale
+        self.frame_index += 1
+        self.stats["frames"] += 1
+
+        face_locations = [t["box"] for t in self.tracks]
+        self.profile.observe(face_locations)
+        return face_locations, [t["name"] for t in self.tracks]
+
+    def _detect(self, rgb_small_frame, scale):
+        self.stats["detections"] += 1
+        self.need_detection = False
+        detections = scale_locations(detect_faces(rgb_small_frame, scale, self.profile), 1 / scale)
+
+        # Greedy IoU association, best overlaps first
+        pairs = sorted(
+            ((iou(t["box"], d), ti, di) for ti, t in enumerate(self.tracks) for di, d in enumerate(detections)),
+            reverse=True,
+        )
+        matched_tracks, matched_dets = set(), set()
+        for overlap, ti, di in pairs:
+            if overlap < IOU_THRESHOLD:
+                break
+            if ti in matched_tracks or di in matched_dets:
+                continue
+            matched_tracks.add(ti)
+            matched_dets.add(di)
+            self.tracks[ti]["box"] = detections[di]
+            self.tracks[ti]["missed"] = 0
+
+        # Encode only new faces and tracks that are still unidentified
+        to_encode = [d for di, d in enumerate(detections) if di not in matched_dets]
+        retry = [self.tracks[ti] for ti in matched_tracks if self.tracks[ti]["name"] == UNKNOWN]
+        to_encode += [t["box"] for t in retry]
+        names = []
+        if to_encode:
+            encodings = encode_faces(rgb_small_frame, scale_locations(to_encode, scale), self.profile)
+            self.stats["encodings"] += len(encodings)
+            names = self.matcher.match_names(encodings)
+
+        new_count = len(to_encode) - len(retry)
+        for track, name in zip(retry, names[new_count:]):
+            track["name"] = name
+
+        survivors = []
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track["missed"] += 1
+                if track["missed"] > self.max_missed:
+                    continue
+            survivors.append(track)
+        for box, name in zip(to_encode[:new_count], names[:new_count]):
+            survivors.append({"id": next(self._ids), "box": box, "name": name, "missed": 0})
+        self.tracks = survivors
+
+    def _follow(self, gray, scale):
+        height, width = gray.shape
+        for track in self.tracks:
+            top, right, bottom, left = scale_locations([track["box"]], scale)[0]
+            mask = np.zeros_like(self.prev_gray)
+            mask[max(0, top):max(0, bottom), max(0, left):max(0, right)] = 255
+            points = cv2.goodFeaturesToTrack(self.prev_gray, maxCorners=30, qualityLevel=0.01,
+                                             minDistance=3, mask=mask)
+            if points is None or len(points) < MIN_FLOW_POINTS:
+                self.need_detection = True
+                continue
+
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None)
+            good = status.reshape(-1) == 1
+            if good.sum() < MIN_FLOW_POINTS:
+                self.need_detection = True
+                continue
+
+            dx, dy = np.median((moved[good] - points[good]).reshape(-1, 2), axis=0)
+            top, bottom = top + dy, bottom + dy
+            left, right = left + dx, right + dx
+            if bottom <= 0 or right <= 0 or top >= height or left >= width:
+                # Walked out of frame
+                self.need_detection = True
+                continue
+            track["box"] = scale_locations([(top, right, bottom, left)], 1 / scale)[0]
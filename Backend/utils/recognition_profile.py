@@ -0,0 +1,80 @@
+import os
+import threading
+from statistics import median
+
+
+class RecognitionProfile:
+    """
+    Detection settings for live frames.
+    scale: downscale factor applied before detection, or "auto" to derive it
+        from the face sizes seen so far (detection cost then follows face
+        size instead of camera resolution).
+    model: "hog" (CPU) or "cnn" (dlib CNN, needs a GPU to be practical).
+    upsample: number_of_times_to_upsample passed to face_locations.
+    num_jitters: re-samples per face when encoding (higher is slower, steadier).
+    min_face_size: faces smaller than this (pixels, original frame) are ignored.
+    """
+
+    def __init__(self, scale=0.5, model="hog", upsample=1, num_jitters=1, min_face_size=0,
+                 target_face_size=100, min_scale=0.25, max_scale=1.0, idle_frames=30):
+        self.auto = scale == "auto"
+        self.model = model
+        self.upsample = upsample
+        self.num_jitters = num_jitters
+        self.min_face_size = min_face_size
+        # Auto mode: aim for faces of target_face_size pixels after downscaling
+        self.target_face_size = target_face_size
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.idle_frames = idle_frames
+        self.scale = max_scale if self.auto else float(scale)
+        self._frames_without_faces = 0
+        # Several capture workers can share one profile
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """Build a profile from FACE_SCALE, FACE_MODEL, FACE_UPSAMPLE, FACE_JITTERS and FACE_MIN_SIZE."""
+        env = os.environ if environ is None else environ
+        scale = env.get("FACE_SCALE", "0.5")
+        return cls(
+            scale=scale if scale == "auto" else float(scale),
+            model=env.get("FACE_MODEL", "hog"),
+            upsample=int(env.get("FACE_UPSAMPLE", "1")),
+            num_jitters=int(env.get("FACE_JITTERS", "1")),
+            min_face_size=int(env.get("FACE_MIN_SIZE", "0")),
+        )
+
+    def observe(self, face_locations):
+        """
+        Feed back the faces found in a frame (original frame coordinates).
+        In auto mode the next frame's scale is moved towards the one that
+        makes the median face target_face_size pixels tall; after
+        idle_frames frames with no faces it drifts back up so small faces at
+        the back of the room can be found again.
+        """
+        if not self.auto:
+            return
+
+        with self._lock:
+            self._observe(face_locations)
+
+    def _observe(self, face_locations):
+        if not face_locations:
+            self._frames_without_faces += 1
+            if self._frames_without_faces >= self.idle_frames:
+                self.scale = min(self.max_scale, self.scale * 1.25)
+                self._frames_without_faces = 0
+            return
+
+        self._frames_without_faces = 0
+        face_height = median(bottom - top for (top, right, bottom, left) in face_locations)
+        if face_height <= 0:
+            return
+        wanted = min(self.max_scale, max(self.min_scale, self.target_face_size / face_height))
+        # Smooth, and snap to 0.05 steps so the resize size stays stable
+        self.scale = round((0.5 * self.scale + 0.5 * wanted) * 20) / 20
+        self.scale = min(self.max_scale, max(self.min_scale, self.scale))
+
+
+DEFAULT_PROFILE = RecognitionProfile()
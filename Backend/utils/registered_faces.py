@@ -0,0 +1,86 @@
+import numpy as np
+
+# Sidecar collection: one 128-d encoding per student, keyed by the student's _id.
+# Kept out of the student documents so listings do not carry the vectors.
+FACE_ENCODINGS_COLLECTION = 'face_encodings'
+
+
+def face_label(student):
+    """Gallery name for a student, in the roll_sem_name_branch format of the image files."""
+    name = str(student.get('name', '')).replace(' ', '')
+    branch = str(student.get('branch', '')).replace(' ', '')
+    return f"{student.get('roll_no')}_{student.get('semester')}_{name}_{branch}"
+
+
+def store_encoding(db, student_id, encoding):
+    """Save (or replace) a student's face encoding."""
+    db[FACE_ENCODINGS_COLLECTION].update_one(
+        {'student_id': student_id},
+        {'$set': {'encoding': np.asarray(encoding, dtype='<f8').tobytes()}},
+        upsert=True
+    )
+
+
+def load_registered_faces(db, semester, branch):
+    """
+    Stored encodings and gallery names of the students in a class, read
+    from MongoDB without touching the image files.
+    Returns (encodings, names, missing) where missing lists the students
+    registered before encodings were stored.
+    """
+    students = [
+        s for s in db['students'].find({'semester': int(semester)},
+                                       {'roll_no': 1, 'name': 1, 'branch': 1, 'semester': 1})
+        if str(s.get('branch', '')).upper() == branch.upper()
+    ]
+    stored = {
+        doc['student_id']: doc['encoding']
+        for doc in db[FACE_ENCODINGS_COLLECTION].find({'student_id': {'$in': [s['_id'] for s in students]}})
+    }
+
+    encodings, names, missing = [], [], []
+    for student in sorted(students, key=face_label):
+        if student['_id'] in stored:
+            encodings.append(np.frombuffer(stored[student['_id']], dtype='<f8'))
+            names.append(face_label(student))
+        else:
+            missing.append(student)
+    return encodings, names, missing
+
+
+def class_rolls(db, semester, branch):
+    """Roll numbers of the students in a class, matched like load_registered_faces."""
+    return [
+        str(s.get('roll_no')) for s in db['students'].find({'semester': int(semester)}, {'roll_no': 1, 'branch': 1})
+        if str(s.get('branch', '')).upper() == branch.upper()
+    ]
+
+
+def registered_face_entries(db, classes=None):
+    """
+    (encoding, meta) for every student with a stored encoding, for
+    utils.encoding_store; with classes, only the students of those
+    (semester, branch) pairs.
+    """
+    query = {}
+    if classes is not None:
+        # Compared like encoding_store._group_key
+        classes = {(int(semester), str(branch).strip().upper()) for semester, branch in classes}
+        query = {'semester': {'$in': sorted({semester for semester, _ in classes})}}
+    students = {
+        s['_id']: s for s in db['students'].find(query, {'roll_no': 1, 'name': 1, 'branch': 1, 'semester': 1})
+        if classes is None or (s.get('semester'), str(s.get('branch', '')).strip().upper()) in classes
+    }
+    encoding_query = {} if classes is None else {'student_id': {'$in': list(students)}}
+    entries = []
+    for doc in db[FACE_ENCODINGS_COLLECTION].find(encoding_query, {'student_id': 1, 'encoding': 1}):
+        student = students.get(doc['student_id'])
+        if student is None or student.get('semester') is None:
+            continue
+        entries.append((np.frombuffer(doc['encoding'], dtype='<f8'), {
+            'roll': str(student.get('roll_no')),
+            'semester': int(student['semester']),
+            'branch': str(student.get('branch', '')),
+            'name': face_label(student),
+        }))
+    return entries
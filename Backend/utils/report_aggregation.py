@@ -0,0 +1,74 @@
+import pandas as pd
+
+# Same normalization as report_engine.records_frame:
+#   str(r.get('roll_no') or r.get('roll', '')).strip()
+_ROLL = {
+    '$trim': {'input': {'$toString': {
+        '$cond': [
+            {'$in': [{'$ifNull': ['$roll_no', None]}, [None, '', 0, False]]},
+            {'$ifNull': ['$roll', '']},
+            '$roll_no'
+        ]
+    }}}
+}
+_STATUS = {'$toLower': {'$ifNull': ['$status', '']}}
+
+
+def _normalized(query):
+    return [
+        {'$match': query},
+        {'$project': {'_id': 0, 'subject_code': 1, 'date': 1, 'roll_norm': _ROLL, 'status_norm': _STATUS}},
+    ]
+
+
+def counts_pipeline(query):
+    """Distinct dates per subject and present counts per (roll, subject), in one document."""
+    return _normalized(query) + [
+        {'$facet': {
+            'held': [
+                {'$group': {'_id': '$subject_code', 'dates': {'$addToSet': '$date'}}},
+                {'$project': {'_id': 0, 'subject_code': '$_id', 'count': {'$size': '$dates'}}},
+            ],
+            'present': [
+                {'$match': {'status_norm': 'present'}},
+                {'$group': {'_id': {'roll': '$roll_norm', 'subject_code': '$subject_code'},
+                            'count': {'$sum': 1}}},
+                {'$project': {'_id': 0, 'roll': '$_id.roll', 'subject_code': '$_id.subject_code', 'count': 1}},
+            ],
+        }},
+    ]
+
+
+def marks_pipeline(query, rolls=None):
+    """
+    Distinct (roll, subject, date) marks for daily sheets. Kept out of the
+    $facet because it grows with students x days and could pass the 16 MB
+    document limit; it is streamed as a normal cursor instead.
+    With rolls, only the marks of those (normalized) rolls are returned.
+    """
+    roll_match = [{'$match': {'roll_norm': {'$in': list(rolls)}}}] if rolls is not None else []
+    return _normalized(query) + roll_match + [
+        {'$group': {'_id': {'roll': '$roll_norm', 'subject_code': '$subject_code', 'date': '$date'}}},
+        {'$project': {'_id': 0, 'roll': '$_id.roll', 'subject_code': '$_id.subject_code', 'date': '$_id.date'}},
+    ]
+
+
+def aggregate_attendance(collection, query, include_marks=False):
+    """
+    Server-side equivalent of report_engine.aggregate_records(list(collection.find(query))).
+    Only per-subject and per-student aggregates cross the network.
+    """
+    result = next(collection.aggregate(counts_pipeline(query), allowDiskUse=True))
+    marks = list(collection.aggregate(marks_pipeline(query), allowDiskUse=True)) if include_marks else []
+    return {
+        'classes_held': {row['subject_code']: row['count'] for row in result['held']
+                         if row.get('subject_code') is not None},
+        'present_counts': pd.DataFrame(result['present'], columns=['roll', 'subject_code', 'count']),
+        'marks': pd.DataFrame(marks, columns=['roll', 'subject_code', 'date']),
+    }
+
+
+def attendance_marks(collection, query, rolls):
+    """Daily-sheet marks of one chunk of students, so the full marks table is never held at once."""
+    marks = collection.aggregate(marks_pipeline(query, rolls), allowDiskUse=True)
+    return pd.DataFrame(list(marks), columns=['roll', 'subject_code', 'date'])
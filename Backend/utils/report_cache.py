@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def _norm(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value.upper() if value else None
+
+
+class ReportCache:
+    """
+    LRU cache of generated report files, bounded by total size and entry age.
+    Each entry remembers the semester, branch and date range it covers so
+    writes can invalidate exactly the reports they affect.
+    A report built while a write to its scope was invalidating the cache may
+    already be stale, so callers take generation() before reading and pass
+    it to put(), which then skips the store.
+    """
+
+    def __init__(self, max_bytes=64 * 2 ** 20, ttl=600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "invalidated": 0,
+                      "stale": 0}
+        self._entries = OrderedDict()  # key -> (stored_at, payload, scope, nbytes)
+        self._generations = {}  # (semester, branch) passed to invalidate() -> times invalidated
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**params):
+        """
+        Stable key from request parameters. Pass the values the report query
+        uses, already normalized, so equal keys always mean equal queries.
+        """
+        return tuple(sorted(params.items()))
+
+    def generation(self, semester, branch):
+        """Token that changes whenever invalidate() may have touched (semester, branch)."""
+        with self._lock:
+            return self._generation(_norm(semester), _norm(branch))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            stored_at, payload, scope, nbytes = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._drop(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return payload
+
+    def put(self, key, payload, nbytes, semester, branch, start_date, end_date, generation=None):
+        """
+        Store payload; scope is what invalidate() matches against. With the
+        generation() taken before the report was read, the payload is
+        dropped if its scope was invalidated in the meantime.
+        """
+        if nbytes > self.max_bytes:
+            return
+        scope = (_norm(semester), _norm(branch), str(start_date), str(end_date))
+        with self._lock:
+            if generation is not None and generation != self._generation(scope[0], scope[1]):
+                self.stats["stale"] += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), payload, scope, nbytes)
+            self.size += nbytes
+            self.stats["stores"] += 1
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, semester=None, branch=None, dates=None):
+        """
+        Drop entries that a write to (semester, branch, dates) could change.
+        None means "any" for that dimension; a cached report with no branch
+        filter covers every branch, so it is always affected.
+        """
+        semester, branch = _norm(semester), _norm(branch)
+        dates = [str(d) for d in dates] if dates else None
+        with self._lock:
+            self._generations[(semester, branch)] = self._generations.get((semester, branch), 0) + 1
+            stale = []
+            for key, (_, _, (e_sem, e_branch, e_start, e_end), _) in self._entries.items():
+                if semester and e_sem and e_sem != semester:
+                    continue
+                if branch and e_branch and e_branch != branch:
+                    continue
+                if dates and not any(e_start <= d <= e_end for d in dates):
+                    continue
+                stale.append(key)
+            for key in stale:
+                self._drop(key)
+            self.stats["invalidated"] += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def snapshot(self):
+        """Counters plus hit rate, for /status."""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats, entries=len(self._entries), bytes=self.size,
+                        hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else None)
+
+    def _generation(self, semester, branch):
+        # Every invalidation that could match the scope, by the rules of invalidate()
+        return sum(count for (i_sem, i_branch), count in self._generations.items()
+                   if (not i_sem or not semester or i_sem == semester)
+                   and (not i_branch or not branch or i_branch == branch))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.size -= entry[3]
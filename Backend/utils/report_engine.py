@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+ABSENT = 'Absent'
+PRESENT = 'Present'
+
+
+def student_roll(s):
+    return str(s.get('roll_no') or s.get('roll', '')).strip()
+
+
+def records_frame(records):
+    """Attendance records as a DataFrame with normalized roll, subject_code, date and status columns."""
+    return pd.DataFrame({
+        'roll': [str(r.get('roll_no') or r.get('roll', '')).strip() for r in records],
+        'subject_code': [r.get('subject_code') for r in records],
+        'date': [r.get('date') for r in records],
+        'status': [str(r.get('status') or '').lower() for r in records],
+    }, columns=['roll', 'subject_code', 'date', 'status'])
+
+
+def aggregate_records(records):
+    """
+    Reduce raw attendance records to what the report sheets need:
+      classes_held   - {subject_code: number of distinct dates}
+      present_counts - DataFrame(roll, subject_code, count) of 'present' records
+      marks          - DataFrame(roll, subject_code, date), one row per distinct mark
+    utils.report_aggregation.aggregate_attendance computes the same thing in MongoDB.
+    """
+    df = records_frame(records)
+    held = df.groupby('subject_code')['date'].nunique(dropna=False) if len(df) else pd.Series(dtype=np.int64)
+    present = df[df['status'] == 'present']
+    return {
+        'classes_held': {subj: int(count) for subj, count in held.items()},
+        'present_counts': present.groupby(['roll', 'subject_code']).size().reset_index(name='count'),
+        'marks': df[['roll', 'subject_code', 'date']].drop_duplicates(),
+    }
+
+
+def _row_positions(rolls, keep):
+    """Map each non-empty roll to the row of its first/last occurrence."""
+    rolls = pd.Series(rolls)
+    unique = rolls[rolls != ''].drop_duplicates(keep=keep)
+    return pd.Series(unique.index, index=unique.values)
+
+
+def daily_report(students, aggregates, subject_codes, start_date, end_date):
+    """
+    One row per student, one '<subject>_<date>' column per subject and day in
+    the range; 'Present' wherever an attendance record exists, else 'Absent'.
+    """
+    date_range = pd.date_range(start=start_date, end=end_date).strftime('%Y-%m-%d').tolist()
+    column_headers = [f'{subj}_{date}' for subj in subject_codes for date in date_range]
+    rolls = [student_roll(s) for s in students]
+
+    grid = np.full((len(students), len(column_headers)), ABSENT, dtype=object)
+    marks = aggregates['marks']
+    if len(marks) and column_headers:
+        keys = marks['subject_code'].astype(str) + '_' + marks['date'].astype(str)
+        valid = (marks['roll'] != '') & marks['subject_code'].isin(subject_codes)
+        hits = pd.DataFrame({'roll': marks['roll'][valid], 'key': keys[valid]})
+
+        # A roll that appears twice in the roster is marked on its first row
+        first_row = _row_positions(rolls, keep='first')
+        rows = hits['roll'].map(first_row)
+        cols = pd.Index(column_headers).get_indexer(hits['key'])
+        mask = rows.notna().values & (cols >= 0)
+        grid[rows.values[mask].astype(np.int64), cols[mask]] = PRESENT
+
+    out = pd.DataFrame({
+        'Roll No': rolls,
+        'Name': [s.get('name', '') for s in students],
+        'Branch': [s.get('branch', '') for s in students],
+    })
+    return pd.concat([out, pd.DataFrame(grid, columns=column_headers)], axis=1)
+
+
+def subject_report(students, aggregates, subject_code):
+    """Classes held, present count and percentage per student for one subject."""
+    total_classes = aggregates['classes_held'].get(subject_code, 0)
+
+    counts = aggregates['present_counts']
+    present = counts[counts['subject_code'] == subject_code].groupby('roll')['count'].sum()
+    rolls = [student_roll(s) for s in students]
+    present_counts = pd.Series(rolls).map(present).fillna(0).astype(np.int64).tolist()
+
+    return pd.DataFrame({
+        'Subject Code': [subject_code] * len(students),
+        'Roll No': rolls,
+        'Name': [s.get('name', '') for s in students],
+        'Branch': [s.get('branch', '') for s in students],
+        'Classes Held': [total_classes] * len(students),
+        'Present Count': present_counts,
+        'Attendance %': [round((count / total_classes) * 100, 2) if total_classes > 0 else 0
+                         for count in present_counts],
+    })
+
+
+def summary_report(students, aggregates, subject_codes):
+    """
+    Weekly/monthly summary: classes held and present count per subject for
+    every student, plus a per-subject table of classes held.
+    Returns (student_df, subject_summary_df).
+    """
+    subject_class_count = {subj: aggregates['classes_held'].get(subj, 0) for subj in subject_codes}
+
+    rolls = [student_roll(s) for s in students]
+    counts = np.zeros((len(students), len(subject_codes)), dtype=np.int64)
+    present = aggregates['present_counts']
+    present = present[present['subject_code'].isin(subject_codes) & (present['roll'] != '')]
+    if len(present) and subject_codes:
+        table = present.pivot_table(index='roll', columns='subject_code', values='count',
+                                    aggfunc='sum', fill_value=0).reindex(columns=subject_codes, fill_value=0)
+        # A roll that appears twice in the roster is counted on its last row
+        last_row = _row_positions(rolls, keep='last')
+        table = table[table.index.isin(last_row.index)]
+        counts[last_row[table.index].values] = table.values
+
+    columns = {
+        'Roll No': [s.get('roll_no') or s.get('roll') or '' for s in students],
+        'Name': [s.get('name', '') for s in students],
+        'Branch': [s.get('branch', '') for s in students],
+    }
+    for i, subj in enumerate(subject_codes):
+        columns[f'{subj} Classes Held'] = [subject_class_count[subj]] * len(students)
+        columns[f'{subj} Present'] = counts[:, i]
+    student_df = pd.DataFrame(columns)
+
+    subject_summary = pd.DataFrame([{
+        'Subject Code': subj,
+        'Total Classes Held': subject_class_count[subj]
+    } for subj in subject_codes])
+    return student_df, subject_summary
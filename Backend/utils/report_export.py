@@ -0,0 +1,146 @@
+import csv
+import io
+import itertools
+import os
+import tempfile
+import zipfile
+
+import xlsxwriter
+
+# Students per DataFrame chunk when turning report frames into row streams
+CHUNK_SIZE = 500
+# Rows per Parquet row group
+PARQUET_BATCH_ROWS = 10000
+
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'zip': 'application/zip',
+}
+
+
+class Sheet:
+    """A named table whose rows are produced lazily, one list/tuple per row."""
+
+    def __init__(self, name, columns, rows):
+        self.name = name
+        self.columns = list(columns)
+        self.rows = rows
+
+
+def sheet_from_chunks(name, frames):
+    """
+    Sheet from an iterable of DataFrames with the same columns (e.g. one per
+    chunk of students). Only one chunk is held in memory at a time.
+    """
+    frames = iter(frames)
+    first = next(frames)
+
+    def rows():
+        for df in itertools.chain([first], frames):
+            yield from df.itertuples(index=False, name=None)
+
+    return Sheet(name, first.columns, rows())
+
+
+def chunked(items, size=CHUNK_SIZE):
+    """
+    Lists of up to size items from any iterable, e.g. a MongoDB cursor, so
+    only one chunk is materialized at a time. Always yields at least one
+    (possibly empty) chunk so sheets still get their header row.
+    """
+    items = iter(items)
+    chunk = list(itertools.islice(items, size))
+    yield chunk
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _plain(value):
+    # numpy scalars -> Python values for writers that are picky about types
+    return value.item() if hasattr(value, 'item') else value
+
+
+def write_xlsx(path, sheets):
+    """Write sheets with xlsxwriter in constant_memory mode: each row is flushed as it is written."""
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'tmpdir': os.path.dirname(path)})
+    header = workbook.add_format({'bold': True, 'border': 1})
+    for sheet in sheets:
+        worksheet = workbook.add_worksheet(sheet.name[:31])
+        worksheet.write_row(0, 0, sheet.columns, header)
+        for i, row in enumerate(sheet.rows, start=1):
+            worksheet.write_row(i, 0, [_plain(v) for v in row])
+    workbook.close()
+
+
+def _write_csv(fileobj, sheet):
+    writer = csv.writer(fileobj)
+    writer.writerow(sheet.columns)
+    for row in sheet.rows:
+        writer.writerow(row)
+
+
+def _write_parquet(path, sheet):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def to_table(batch):
+        columns = list(zip(*batch)) if batch else [[] for _ in sheet.columns]
+        return pa.table({name: [_plain(v) for v in values] for name, values in zip(sheet.columns, columns)})
+
+    writer = None
+    rows = iter(sheet.rows)
+    try:
+        # Schema comes from the first row group; later groups are cast to it
+        while True:
+            batch = list(itertools.islice(rows, PARQUET_BATCH_ROWS))
+            if not batch:
+                break
+            table = to_table(batch)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is None:
+            pq.write_table(to_table([]), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_export(path, sheets, fmt):
+    """
+    Write sheets to path in fmt. CSV and Parquet hold one table per file, so
+    multi-sheet reports become a zip with one file per sheet.
+    Returns the file extension to use for the download.
+    """
+    if fmt == 'xlsx':
+        write_xlsx(path, sheets)
+        return 'xlsx'
+
+    if len(sheets) == 1:
+        if fmt == 'csv':
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                _write_csv(f, sheets[0])
+        else:
+            _write_parquet(path, sheets[0])
+        return fmt
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for sheet in sheets:
+            entry = f"{sheet.name}.{fmt}"
+            if fmt == 'csv':
+                with zf.open(entry, 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+                    _write_csv(f, sheet)
+            else:
+                fd, part = tempfile.mkstemp(suffix='.parquet', dir=os.path.dirname(path))
+                os.close(fd)
+                try:
+                    _write_parquet(part, sheet)
+                    zf.write(part, entry)
+                finally:
+                    os.remove(part)
+    return 'zip'
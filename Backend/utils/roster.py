@@ -0,0 +1,47 @@
+import threading
+import time
+
+
+class RosterCache:
+    """
+    Registered roll numbers, loaded in one query and refreshed every ttl
+    seconds, so validating a mark does not cost a students lookup.
+    A roll missing from the snapshot is looked up once before it is
+    rejected, which covers students registered since the last refresh.
+    """
+
+    def __init__(self, collection, ttl=300):
+        self.collection = collection
+        self.ttl = ttl
+        self._rolls = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        rolls = set()
+        for s in self.collection.find({}, {'_id': 0, 'roll_no': 1, 'roll': 1}):
+            for field in ('roll_no', 'roll'):
+                if s.get(field) is not None:
+                    rolls.add(str(s[field]).strip())
+        self._rolls = rolls
+        self._loaded_at = time.monotonic()
+
+    def contains(self, roll):
+        roll = str(roll).strip()
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._refresh()
+            if roll in self._rolls:
+                return True
+        if self.collection.find_one({'$or': [{'roll': roll}, {'roll_no': roll}]}, {'_id': 1}) is None:
+            return False
+        self.add(roll)
+        return True
+
+    def add(self, roll):
+        with self._lock:
+            self._rolls.add(str(roll).strip())
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
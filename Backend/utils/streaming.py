@@ -0,0 +1,96 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import Response, current_app, stream_with_context
+
+# Largest page a client may ask for
+MAX_PAGE_SIZE = 5000
+# Documents fetched from the server per round trip while streaming
+CURSOR_BATCH_SIZE = 500
+
+
+def parse_list_args(args):
+    """
+    Read the listing options shared by the bulk endpoints:
+      limit  - page size (omit for everything)
+      after  - resume token: the _id of the last document of the previous page
+      fields - comma-separated projection (_id is always included)
+      format - "json" (a JSON array, the default) or "ndjson" (one document per line)
+    Raises ValueError on bad input.
+    """
+    limit = args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    after = args.get('after')
+    if after:
+        try:
+            after = ObjectId(after)
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid resume token")
+
+    fields = args.get('fields')
+    projection = None
+    if fields:
+        projection = {field.strip(): 1 for field in fields.split(',') if field.strip()}
+        projection['_id'] = 1
+
+    fmt = args.get('format', 'json').lower()
+    if fmt not in ('json', 'ndjson'):
+        raise ValueError("format must be json or ndjson")
+
+    return {'limit': limit, 'after': after, 'projection': projection, 'format': fmt}
+
+
+def find_page(collection, query, options):
+    """Cursor for one page of query, resuming after options['after'] in _id order."""
+    if options['after']:
+        query = {'$and': [query, {'_id': {'$gt': options['after']}}]}
+    cursor = collection.find(query, options['projection']).batch_size(CURSOR_BATCH_SIZE)
+    # Only pages need a stable order; a full stream takes whatever the index gives
+    if options['limit'] or options['after']:
+        cursor = cursor.sort('_id', 1)
+    if options['limit']:
+        cursor = cursor.limit(options['limit'])
+    return cursor
+
+
+def _encode(doc):
+    doc['_id'] = str(doc['_id'])
+    return current_app.json.dumps(doc)
+
+
+def stream_documents(cursor, options):
+    """
+    Response that encodes documents as they come off the cursor.
+    Without a limit the whole result is streamed (memory stays flat); with a
+    limit the page is read first so the next resume token can be sent in the
+    X-Next-Cursor header (empty on the last page).
+    """
+    headers = {}
+    documents = cursor
+    if options['limit']:
+        documents = list(cursor)
+        last_page = len(documents) < options['limit']
+        headers['X-Next-Cursor'] = '' if last_page else str(documents[-1]['_id'])
+        headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+
+    def generate():
+        first = True
+        if options['format'] == 'json':
+            yield '['
+        for doc in documents:
+            if options['format'] == 'ndjson':
+                yield _encode(doc) + '\n'
+            else:
+                yield ('' if first else ',') + _encode(doc)
+            first = False
+        if options['format'] == 'json':
+            yield ']'
+
+    mimetype = 'application/x-ndjson' if options['format'] == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
@@ -143,6 +143,25 @@ testCameraBtn.addEventListener('click', async () => {
     showStatus('Camera preview started. If you see yourself, camera is working!');
 });
 
+// Poll a background attendance session until it finishes
+async function waitForSession(sessionId) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const res = await fetch(`http://127.0.0.1:8080/attendance/session/${sessionId}`);
+        const session = await res.json();
+        if (!res.ok) {
+            return { error: session.error || 'Lost track of attendance session' };
+        }
+        showStatus(`Attendance session running... ${session.present_count} present, ${session.absent_count} not yet seen`);
+        if (session.status === 'failed') {
+            return { error: session.error || 'Attendance session failed' };
+        }
+        if (['completed', 'stopped', 'timed_out'].includes(session.status)) {
+            return session.result || {};
+        }
+    }
+}
+
 // Handle Attendance Form Submit
 attendanceForm.addEventListener('submit', async (e) => {
     e.preventDefault();
@@ -173,9 +192,15 @@ attendanceForm.addEventListener('submit', async (e) => {
             })
         });
 
-        const data = await response.json();
+        let data = await response.json();
+
+        if (response.ok && data.session_id) {
+            // Capture runs in the background; poll until the session finishes
+            showStatus('Attendance session running...');
+            data = await waitForSession(data.session_id);
+        }
 
-        if (response.ok) {
+        if (response.ok && !data.error) {
             showStatus('Attendance started successfully! Redirecting to dashboard...');
             downloadSection.style.display = 'block';
             currentExcelFile = data.excel_file;
@@ -368,12 +368,22 @@ function submitBulkAttendance() {
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ attendance: attendanceList })
   })
-  .then(res => {
-    if (res.ok) {
+  .then(res => res.json().then(data => ({ status: res.status, data })))
+  .then(({ status, data }) => {
+    // 207: some rows were saved, the rest are listed in results
+    const rejected = (data.results || []).filter(r => r.status === 'invalid' || r.status === 'failed');
+    const details = rejected
+      .map(r => `${attendanceList[r.index]?.roll_no || 'row ' + (r.index + 1)}: ${r.error}`)
+      .join('\n');
+    if (status === 200) {
       alert('✅ Attendance saved.');
-      loadStudentsForSubject();  // Reload after save
+    } else if (status === 207) {
+      alert(`⚠️ Saved ${attendanceList.length - rejected.length} of ${attendanceList.length} rows. Not saved:\n${details}`);
     } else {
-      alert('❌ Failed to save.');
+      alert(`❌ Failed to save. ${data.message || ''}${details ? '\n' + details : ''}`);
+    }
+    if (status === 200 || status === 207) {
+      loadStudentsForSubject();  // Reload after save
     }
   })
   .catch(() => {
@@ -626,11 +636,10 @@ function jumpToNextSemester() {
         alert("Error: " + data.error);
       } else {
         const studentsUpdated = data.students_updated !== undefined ? data.students_updated : 0;
-        const filesRenamed = data.files_renamed !== undefined ? data.files_renamed : 0;
 
         alert(
           data.message +
-            `\n\nDetails:\n- Students updated: ${studentsUpdated}\n- Files renamed: ${filesRenamed}`
+            `\n\nDetails:\n- Students updated: ${studentsUpdated}`
         );
       }
     })